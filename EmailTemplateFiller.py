@@ -3,8 +3,31 @@ Email Template Filler (Automation Tool)
 Teaches: String Formatting, File I/O, String Replacement, Automation
 """
 
+import argparse
+import asyncio
+import csv
+import hashlib
+import itertools
+import json
 import os
+import re
+import smtplib
+import struct
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from datetime import datetime
+from email.message import EmailMessage
+
+try:
+    import resource      # Unix only: used to report peak memory in benchmarks
+except ImportError:
+    resource = None
+
+# Placeholder grammar: a word between curly braces, e.g. {recipient_name}
+PLACEHOLDER_PATTERN = re.compile(r'\{(\w+)\}')
 
 
 # ========== TEMPLATE CREATION ==========
@@ -114,6 +137,64 @@ Warm regards,
             print(f"✓ Created template: {filename}")
 
 
+# ========== INSTRUMENTATION ==========
+# Opt-in per-stage timers and counters. While disabled (None) the hot paths
+# only pay for one `is None` check.
+_stage_stats = None
+
+
+def enable_stage_stats():
+    """Start collecting per-stage timings, return the (empty) stats dict"""
+    global _stage_stats
+    _stage_stats = {}
+    return _stage_stats
+
+
+def disable_stage_stats():
+    """Stop collecting and return what was collected"""
+    global _stage_stats
+    stats, _stage_stats = _stage_stats, None
+    return stats
+
+
+def record_stage(stage, seconds, num_bytes=0):
+    """Add one timed call to a stage's totals"""
+    entry = _stage_stats.setdefault(stage, {"calls": 0, "seconds": 0.0, "bytes": 0})
+    entry["calls"] += 1
+    entry["seconds"] += seconds
+    entry["bytes"] += num_bytes
+
+
+def merge_stage_stats(stats):
+    """Fold stats collected elsewhere (e.g. in a worker process) into ours"""
+    for stage, other in stats.items():
+        entry = _stage_stats.setdefault(stage, {"calls": 0, "seconds": 0.0, "bytes": 0})
+        for key in entry:
+            entry[key] += other[key]
+
+
+def timed_iter(items, stage):
+    """Yield from items, recording the time spent producing each one"""
+    iterator = iter(items)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        record_stage(stage, time.perf_counter() - start)
+        yield item
+
+
+def peak_memory_mb():
+    """Peak resident memory of this process in MB (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
 # ========== FILE OPERATIONS ==========
 def read_template(filename):
     """Read template file and return its content"""
@@ -129,20 +210,65 @@ def read_template(filename):
         return None
 
 
-def save_filled_email(content, recipient_name):
+# Per-process counter that keeps output names unique within the same second
+_output_counter = itertools.count(1)
+_output_folder_ready = False
+
+
+def write_file_atomic(filename, content):
+    """Write to a temporary file, then rename it into place in one step"""
+    # Readers (and parallel writers) never see a half-written email
+    temp_filename = f"{filename}.{os.getpid()}.tmp"
+    try:
+        with open(temp_filename, 'w') as file:
+            file.write(content)
+        os.replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+
+
+def output_filename(recipient_name, recipient_id=None):
+    """Build the output path for a recipient's email"""
+    # Recipient names can come from data files, so keep them filename-safe
+    recipient_name = re.sub(r'[^\w\-]+', '_', str(recipient_name))
+    
+    if recipient_id is None:
+        # Timestamp for humans, plus process id and a counter so that many
+        # emails for the same recipient in the same second never collide
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        unique = f"{os.getpid()}_{next(_output_counter):06d}"
+        return f"output/email_{recipient_name}_{timestamp}_{unique}.txt"
+    
+    # Batch runs name files by recipient id (see recipient_id_for), so re-runs
+    # are deterministic and a recipient keeps its file when other rows move
+    recipient_id = str(recipient_id)
+    recipient_id = (recipient_id.zfill(7) if recipient_id.isdigit()
+                    else re.sub(r'[^\w\-]+', '_', recipient_id))
+    return f"output/email_{recipient_name}_{recipient_id}.txt"
+
+
+def save_filled_email(content, recipient_name, recipient_id=None, verbose=True):
     """Save filled email to output folder"""
-    # Create output directory if it doesn't exist
-    if not os.path.exists("output"):
-        os.makedirs("output")
+    global _output_folder_ready
     
-    # Generate filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"output/email_{recipient_name}_{timestamp}.txt"
+    # Create output directory if it doesn't exist (checked once per process)
+    if not _output_folder_ready:
+        os.makedirs("output", exist_ok=True)
+        _output_folder_ready = True
+    
+    filename = output_filename(recipient_name, recipient_id)
     
     try:
-        with open(filename, 'w') as file:
-            file.write(content)
-        print(f"✓ Email saved to: {filename}")
+        if _stage_stats is None:
+            write_file_atomic(filename, content)
+        else:
+            start = time.perf_counter()
+            write_file_atomic(filename, content)
+            record_stage("write", time.perf_counter() - start, len(content))
+        if verbose:
+            print(f"✓ Email saved to: {filename}")
         return filename
     except Exception as e:
         print(f"❌ Error saving file: {e}")
@@ -152,11 +278,8 @@ def save_filled_email(content, recipient_name):
 # ========== PLACEHOLDER DETECTION ==========
 def find_placeholders(template):
     """Find all placeholders in template (words between {})"""
-    placeholders = []
-    
     # Simple method: look for {word}
-    import re
-    matches = re.findall(r'\{(\w+)\}', template)
+    matches = PLACEHOLDER_PATTERN.findall(template)
     
     # Remove duplicates and return
     return list(set(matches))
@@ -201,14 +324,95 @@ def get_placeholder_values(placeholders):
 
 def fill_template(template, values):
     """Replace placeholders with actual values"""
-    filled_template = template
+    return render_template(compile_template(template), values)
+
+
+# ========== COMPILED TEMPLATES ==========
+def compile_template(template):
+    """Split a template into literal text and placeholder slots (done once)"""
+    # re.split with a capture group alternates: literal, slot, literal, slot, ..., literal
+    parts = PLACEHOLDER_PATTERN.split(template)
     
-    # Replace each placeholder
-    for placeholder, value in values.items():
-        # Replace {placeholder} with value
-        filled_template = filled_template.replace(f"{{{placeholder}}}", value)
+    return {
+        "literals": parts[0::2],                # Text between placeholders
+        "slots": parts[1::2],                   # Placeholder names, in order
+        "placeholders": sorted(set(parts[1::2]))
+    }
+
+
+def render_template(compiled, values):
+    """Fill a compiled template in a single pass and a single join"""
+    literals = compiled["literals"]
+    pieces = [literals[0]]
+    
+    for slot, literal in zip(compiled["slots"], literals[1:]):
+        value = values.get(slot)
+        # Unknown placeholders are left untouched, like the old str.replace loop
+        pieces.append(f"{{{slot}}}" if value is None else value)
+        pieces.append(literal)
     
-    return filled_template
+    return "".join(pieces)
+
+
+# ========== COLUMNAR RENDERING ==========
+def render_columns(compiled, columns, num_rows):
+    """Render num_rows emails at once from columns keyed by placeholder name"""
+    literals = compiled["literals"]
+    
+    # One sequence per template segment: literal text repeats on every row
+    segments = [[literals[0]] * num_rows]
+    for slot, literal in zip(compiled["slots"], literals[1:]):
+        column = columns.get(slot)
+        segments.append([f"{{{slot}}}"] * num_rows if column is None else column)
+        if literal:
+            segments.append([literal] * num_rows)
+    
+    # zip walks every segment together, so each email is a single join
+    return ["".join(parts) for parts in zip(*segments)]
+
+
+# ========== TEMPLATE CACHE ==========
+# Keeps the text, placeholders and compiled form of recently used templates,
+# so a template is only re-read and re-parsed when its file actually changes.
+TEMPLATE_CACHE_SIZE = 32
+_template_cache = OrderedDict()      # filename -> cached entry, oldest first
+
+
+def get_template(filename):
+    """Return {"text", "placeholders", "compiled"} for a template file, or None"""
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        _template_cache.pop(filename, None)
+        return read_template(filename)       # Prints the usual error, returns None
+    
+    # A changed file almost always changes its modification time or its size
+    signature = (stat.st_mtime_ns, stat.st_size)
+    
+    entry = _template_cache.get(filename)
+    if entry is not None and entry["signature"] == signature:
+        _template_cache.move_to_end(filename)     # Mark as recently used
+        return entry
+    
+    text = read_template(filename)
+    if text is None:
+        _template_cache.pop(filename, None)
+        return None
+    
+    entry = {
+        "signature": signature,
+        "text": text,
+        "placeholders": find_placeholders(text),
+        "compiled": compile_template(text)
+    }
+    _template_cache[filename] = entry
+    _template_cache.move_to_end(filename)
+    
+    # Evict the least recently used template once the cache is full
+    if len(_template_cache) > TEMPLATE_CACHE_SIZE:
+        _template_cache.popitem(last=False)
+    
+    return entry
 
 
 # ========== MANUAL TEMPLATE CREATION ==========
@@ -263,13 +467,13 @@ def batch_fill_templates():
     if not template_file:
         return
     
-    # Read template
-    template = read_template(template_file)
-    if not template:
+    # Read template (parsed and compiled once, then served from the cache)
+    cached = get_template(template_file)
+    if not cached or not cached["text"]:
         return
     
-    # Find placeholders
-    placeholders = find_placeholders(template)
+    placeholders = cached["placeholders"]
+    compiled = cached["compiled"]
     
     # Get number of emails
     try:
@@ -288,7 +492,7 @@ def batch_fill_templates():
         values = get_placeholder_values(placeholders)
         
         # Fill template
-        filled_email = fill_template(template, values)
+        filled_email = render_template(compiled, values)
         
         # Save to file
         recipient_name = values.get('recipient_name', f'recipient_{i+1}')
@@ -297,6 +501,555 @@ def batch_fill_templates():
     print(f"\n✓ Successfully generated {num_emails} emails!")
 
 
+# ========== FILE-DRIVEN BATCH PROCESSING ==========
+def stream_recipients(filename):
+    """Yield recipient rows (dicts) one at a time from a CSV or JSONL file"""
+    if filename.endswith(('.jsonl', '.ndjson')):
+        with open(filename, 'r', encoding='utf-8') as file:
+            for line in file:
+                line = line.strip()
+                if line:                 # Ignore blank lines
+                    yield json.loads(line)
+    else:
+        # Anything else is treated as CSV with a header row
+        with open(filename, 'r', newline='', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                yield row
+
+
+def row_to_values(row, placeholders):
+    """Map a recipient row's columns onto the template placeholders"""
+    values = {}
+    for placeholder in placeholders:
+        value = row.get(placeholder)
+        # Missing or empty columns get the same default as interactive mode
+        if value is None or value == "":
+            value = f"[{placeholder}]"
+        values[placeholder] = str(value)
+    return values
+
+
+def numbered_rows(recipients_file, placeholders):
+    """Yield (row_number, row) pairs, warning once about missing columns"""
+    for row_number, row in enumerate(stream_recipients(recipients_file), start=1):
+        if row_number == 1:
+            missing = [p for p in placeholders if p not in row]
+            if missing:
+                print(f"⚠ Columns missing for: {', '.join(missing)}")
+        yield row_number, row
+
+
+def recipient_id_for(row, row_number):
+    """Identify a recipient by its recipient_id column, or by its row number"""
+    return str(row.get('recipient_id') or row_number)
+
+
+def recipient_name_for(values, row_number):
+    """Name used in a batch output filename"""
+    return values.get('recipient_name', f'recipient_{row_number}')
+
+
+def render_rows(compiled, rows, chunk_size=1000):
+    """Yield (row_number, row, values, email) for each (row_number, row) pair"""
+    placeholders = compiled["placeholders"]
+    # Rows are read chunk_size at a time and rendered together by
+    # render_columns, so memory stays flat while each email is a single join
+    for chunk in chunk_rows(rows, chunk_size):
+        start = time.perf_counter()
+        chunk_values = [row_to_values(row, placeholders) for row_number, row in chunk]
+        columns = {p: [values[p] for values in chunk_values] for p in placeholders}
+        emails = render_columns(compiled, columns, len(chunk))
+        if _stage_stats is not None:
+            record_stage("render", time.perf_counter() - start, sum(map(len, emails)))
+        for (row_number, row), values, email in zip(chunk, chunk_values, emails):
+            yield row_number, row, values, email
+
+
+def render_and_save_rows(compiled, rows, verbose=False, archive=None, chunk_size=1000):
+    """Render and save (row_number, row) pairs, return how many were written"""
+    count = 0
+    for row_number, row, values, email in render_rows(compiled, rows, chunk_size):
+        recipient_id = recipient_id_for(row, row_number)
+        if archive is not None:
+            append_to_archive(archive, recipient_id, email)
+        else:
+            save_filled_email(email, recipient_name_for(values, row_number),
+                              recipient_id=recipient_id, verbose=verbose)
+        count += 1
+    return count
+
+
+def batch_fill_from_file(template_file, recipients_file, verbose=False,
+                         workers=1, chunk_size=1000, archive_file=None,
+                         smtp_host=None, smtp_port=None, sender=None, connections=4,
+                         incremental=False, stats_file=None):
+    """Fill a template for every row of a recipient file (no prompts)"""
+    cached = get_template(template_file)
+    if not cached or not cached["text"]:
+        return 0
+    
+    if smtp_host and connections < 1:
+        print(f"❌ Error: need at least one SMTP connection, got {connections}")
+        return 0
+    
+    compiled = cached["compiled"]
+    # Rows are streamed, so memory stays flat however long the file is
+    rows = numbered_rows(recipients_file, compiled["placeholders"])
+    
+    # Optional per-stage timings, written as JSON when the batch finishes
+    if stats_file:
+        enable_stage_stats()
+        rows = timed_iter(rows, "read")
+        batch_start = time.perf_counter()
+    # Optionally pack every email into one archive instead of one file each
+    archive = open_archive(archive_file) if archive_file else None
+    
+    # Incremental runs only render rows whose template or values changed
+    if incremental and (archive or smtp_host):
+        print("⚠ Incremental mode only applies to file output; rendering every row.")
+        incremental = False
+    if incremental:
+        old_manifest = load_manifest()
+        new_manifest = {}
+        skipped = []                     # Filled in by the generator
+        rows = changed_rows(rows, cached["text"], compiled["placeholders"],
+                            old_manifest, new_manifest, skipped)
+    
+    count = 0
+    try:
+        if smtp_host:
+            # Send each email over SMTP instead of writing it to disk
+            messages = rendered_messages(compiled, rows, sender or DEFAULT_SENDER)
+            stats = deliver_messages(messages, smtp_host, smtp_port or SMTP_PORT,
+                                     connections=connections)
+            print(f"✓ Delivered {stats['sent']} emails ({stats['failed']} failed, "
+                  f"{stats['skipped']} without a '{RECIPIENT_EMAIL_COLUMN}')")
+            count = stats["sent"]
+        elif workers > 1:
+            count = parallel_render(compiled, rows, workers, chunk_size, archive=archive)
+        else:
+            count = render_and_save_rows(compiled, rows, verbose=verbose, archive=archive,
+                                         chunk_size=chunk_size)
+    except FileNotFoundError:
+        print(f"❌ Error: Recipient file '{recipients_file}' not found!")
+    except (ValueError, csv.Error) as e:
+        print(f"❌ Error reading recipients: {e}")
+    else:
+        if incremental:
+            removed = finish_manifest(old_manifest, new_manifest)
+            print(f"✓ {len(skipped)} unchanged, {removed} removed")
+    finally:
+        if archive is not None:
+            close_archive(archive)
+        if stats_file:
+            write_stage_stats(stats_file, disable_stage_stats(), count,
+                              time.perf_counter() - batch_start)
+    
+    print(f"✓ Generated {count} emails from '{recipients_file}'")
+    return count
+
+
+def write_stage_stats(filename, stats, count, seconds):
+    """Write a batch's per-stage timings and totals as JSON"""
+    report = {
+        "emails": count,
+        "seconds": round(seconds, 6),
+        "emails_per_second": round(count / seconds, 1) if seconds else None,
+        "peak_memory_mb": peak_memory_mb(),
+        "stages": stats
+    }
+    with open(filename, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"✓ Stage timings written to: {filename}")
+    return report
+
+
+# ========== INCREMENTAL RE-RENDERING ==========
+# The manifest sits next to the output folder and remembers, per recipient,
+# a hash of (template, row values) and the file that was written for it.
+MANIFEST_FILE = "output_manifest.json"
+
+
+def load_manifest(filename=MANIFEST_FILE):
+    """Load the manifest: recipient id -> [hash, output filename]"""
+    try:
+        with open(filename, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except ValueError:
+        print(f"⚠ Manifest '{filename}' is damaged; rendering every row.")
+        return {}
+
+
+def row_hash(template, row):
+    """Hash of everything that decides what a recipient's email looks like"""
+    digest = hashlib.sha256(template.encode('utf-8'))
+    digest.update(json.dumps(row, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def changed_rows(rows, template, placeholders, old_manifest, new_manifest, skipped):
+    """Yield only rows that need rendering, recording every row in new_manifest"""
+    for row_number, row in rows:
+        recipient_id = recipient_id_for(row, row_number)
+        values = row_to_values(row, placeholders)
+        filename = output_filename(recipient_name_for(values, row_number), recipient_id)
+        entry = [row_hash(template, row), filename]
+        new_manifest[recipient_id] = entry
+        
+        if old_manifest.get(recipient_id) == entry and os.path.exists(filename):
+            skipped.append(recipient_id)
+            continue
+        yield row_number, row
+
+
+def finish_manifest(old_manifest, new_manifest, filename=MANIFEST_FILE):
+    """Delete outputs of removed or renamed rows, then save the new manifest"""
+    kept_files = {entry[1] for entry in new_manifest.values()}
+    removed = 0
+    for recipient_id, (old_hash, old_file) in old_manifest.items():
+        if old_file not in kept_files and os.path.exists(old_file):
+            os.remove(old_file)
+            if recipient_id not in new_manifest:
+                removed += 1
+    
+    write_file_atomic(filename, json.dumps(new_manifest))
+    return removed
+
+
+# ========== PARALLEL BATCH PROCESSING ==========
+# Each worker process receives the compiled template once, when it starts
+_worker_template = None
+
+
+def _init_render_worker(compiled, collect_stats=False):
+    """Process pool initializer: keep the compiled template for every chunk"""
+    global _worker_template
+    _worker_template = compiled
+    if collect_stats:
+        enable_stage_stats()
+
+
+def _render_chunk(chunk, to_archive=False):
+    """Render one chunk of rows inside a worker, return (result, stage stats)"""
+    if to_archive:
+        # The archive lives in the parent process, so send the emails back
+        result = [(recipient_id_for(row, row_number), email)
+                  for row_number, row, values, email in render_rows(_worker_template, chunk)]
+    else:
+        result = render_and_save_rows(_worker_template, chunk)
+    
+    # Hand this chunk's timings to the parent and start afresh for the next one
+    stats = None
+    if _stage_stats is not None:
+        stats = disable_stage_stats()
+        enable_stage_stats()
+    return result, stats
+
+
+def chunk_rows(rows, chunk_size):
+    """Group an iterator of rows into lists of at most chunk_size rows"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def parallel_render(compiled, rows, workers=None, chunk_size=1000, archive=None):
+    """Shard rows across a process pool, return how many emails were written"""
+    workers = workers or os.cpu_count() or 1
+    count = 0
+    pending = set()
+    
+    def collect(future):
+        result, stats = future.result()
+        if stats:
+            merge_stage_stats(stats)
+        if archive is None:
+            return result
+        for recipient_id, email in result:
+            append_to_archive(archive, recipient_id, email)
+        return len(result)
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                             initargs=(compiled, _stage_stats is not None)) as pool:
+        for chunk in chunk_rows(rows, chunk_size):
+            pending.add(pool.submit(_render_chunk, chunk, archive is not None))
+            
+            # Keep only a couple of chunks per worker in flight so memory stays flat
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                count += sum(collect(future) for future in done)
+        
+        for future in pending:
+            count += collect(future)
+    
+    return count
+
+
+# ========== EMAIL DELIVERY ==========
+# Rendered emails can be sent over SMTP instead of saved. For local testing run
+# a debugging server, e.g. `python -m aiosmtpd -n -l localhost:8025`.
+SMTP_PORT = 8025
+RECIPIENT_EMAIL_COLUMN = "recipient_email"
+DEFAULT_SENDER = "noreply@localhost"
+DELIVERY_QUEUE_SIZE = 100      # Rendered emails waiting to be sent
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5            # Seconds before the first retry, doubled each time
+
+
+def build_message(email, sender, recipient):
+    """Turn a rendered email ('Subject: ...' first line) into an EmailMessage"""
+    first_line, _, body = email.partition('\n')
+    if first_line.startswith("Subject:"):
+        subject = first_line[len("Subject:"):].strip()
+        body = body.lstrip('\n')
+    else:
+        subject, body = "", email
+    
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = recipient
+    message["Subject"] = subject
+    message.set_content(body)
+    return message
+
+
+def rendered_messages(compiled, rows, sender):
+    """Yield an EmailMessage per row, or None for rows without an address"""
+    for row_number, row, values, email in render_rows(compiled, rows):
+        recipient = row.get(RECIPIENT_EMAIL_COLUMN)
+        yield build_message(email, sender, recipient) if recipient else None
+
+
+def _is_permanent_failure(error):
+    """5xx replies and refused recipients will not succeed on a retry"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+async def _delivery_worker(queue, host, port, stats):
+    """Send messages from the queue over one SMTP connection, reusing it"""
+    connection = None
+    try:
+        while True:
+            message = await queue.get()
+            if message is None:              # No more messages
+                break
+            
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    if connection is None:
+                        connection = await asyncio.to_thread(smtplib.SMTP, host, port,
+                                                             timeout=30)
+                    # smtplib blocks, so it runs in a thread while the loop keeps going
+                    start = time.perf_counter()
+                    await asyncio.to_thread(connection.send_message, message)
+                    if _stage_stats is not None:
+                        record_stage("deliver", time.perf_counter() - start)
+                    stats["sent"] += 1
+                    break
+                except (smtplib.SMTPException, OSError) as e:
+                    # Drop the connection; a fresh one is opened for the retry
+                    if connection is not None:
+                        connection.close()
+                        connection = None
+                    if attempt == MAX_RETRIES or _is_permanent_failure(e):
+                        print(f"❌ Could not send to {message['To']}: {e}")
+                        stats["failed"] += 1
+                        break
+                    await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+    except BaseException:
+        if connection is not None:           # Failed or cancelled: no polite QUIT
+            connection.close()
+        raise
+    
+    if connection is not None:
+        try:
+            await asyncio.to_thread(connection.quit)
+        except (smtplib.SMTPException, OSError):
+            connection.close()
+
+
+async def _feed_queue(queue, messages, stats, num_workers):
+    """Put messages on the queue, then one stop signal per worker"""
+    for message in messages:
+        if message is None:
+            stats["skipped"] += 1
+            continue
+        await queue.put(message)             # Waits while the queue is full
+    
+    for _ in range(num_workers):
+        await queue.put(None)
+
+
+async def _deliver(messages, host, port, connections):
+    """Feed messages into a bounded queue drained by a pool of connections"""
+    stats = {"sent": 0, "failed": 0, "skipped": 0}
+    queue = asyncio.Queue(maxsize=DELIVERY_QUEUE_SIZE)
+    workers = [asyncio.create_task(_delivery_worker(queue, host, port, stats))
+               for _ in range(connections)]
+    producer = asyncio.create_task(_feed_queue(queue, messages, stats, len(workers)))
+    
+    try:
+        await asyncio.gather(producer, *workers)
+    except BaseException:
+        # A failed worker would leave the producer waiting on a full queue
+        # forever (and a failed producer, the workers on an empty one)
+        for task in [producer, *workers]:
+            task.cancel()
+        await asyncio.gather(producer, *workers, return_exceptions=True)
+        raise
+    return stats
+
+
+def deliver_messages(messages, host="localhost", port=SMTP_PORT, connections=4):
+    """Send EmailMessages over up to `connections` SMTP connections at once"""
+    if connections < 1:
+        raise ValueError(f"need at least one SMTP connection, got {connections}")
+    return asyncio.run(_deliver(messages, host, port, connections))
+
+
+# ========== PACKED ARCHIVE OUTPUT ==========
+# One data file holds every email as a 4-byte length followed by UTF-8 text,
+# and a tab-separated index file maps recipient id -> offset and length.
+# New entries are appended while a batch runs; closing the archive sorts the
+# index by recipient id, so one email can be found by binary search. A
+# recipient written again (e.g. by a later batch) keeps only its latest entry.
+ARCHIVE_FILE = "output/emails.pack"
+RECORD_HEADER = struct.Struct(">I")
+ARCHIVE_BUFFER_SIZE = 1024 * 1024
+
+
+def open_archive(filename=ARCHIVE_FILE):
+    """Open (or create) an archive for appending emails"""
+    folder = os.path.dirname(filename)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    
+    data = open(filename, 'ab', buffering=ARCHIVE_BUFFER_SIZE)
+    index = open(filename + ".idx", 'a', encoding='utf-8', buffering=ARCHIVE_BUFFER_SIZE)
+    # Append mode starts at the end of the file, which is where new records go
+    return {"data": data, "index": index, "offset": data.tell(), "filename": filename}
+
+
+def append_to_archive(archive, recipient_id, content):
+    """Append one email to the archive and record where it is"""
+    start = time.perf_counter() if _stage_stats is not None else None
+    body = content.encode('utf-8')
+    archive["data"].write(RECORD_HEADER.pack(len(body)))
+    archive["data"].write(body)
+    
+    archive["index"].write(f"{index_key(recipient_id)}\t{archive['offset']}\t{len(body)}\n")
+    archive["offset"] += RECORD_HEADER.size + len(body)
+    
+    if start is not None:
+        record_stage("write", time.perf_counter() - start, len(body))
+
+
+def index_key(recipient_id):
+    """A recipient id as written in the index (tabs and newlines would break the line)"""
+    return re.sub(r'[\t\r\n]', ' ', str(recipient_id))
+
+
+def close_archive(archive):
+    """Flush buffered writes, close the archive files and sort the index"""
+    archive["data"].close()
+    archive["index"].close()
+    sort_archive_index(archive["filename"])
+
+
+def sort_archive_index(filename=ARCHIVE_FILE):
+    """Rewrite the index sorted by recipient id, keeping each id's latest entry"""
+    latest = {}
+    with open(filename + ".idx", 'rb') as file:
+        for line in file:
+            if line.endswith(b"\n"):          # Skip a line cut off by a crash
+                latest[line.split(b"\t", 1)[0]] = line     # Later entries win
+    
+    temp_filename = f"{filename}.idx.{os.getpid()}.tmp"
+    with open(temp_filename, 'wb') as file:
+        file.writelines(latest[key] for key in sorted(latest))
+    os.replace(temp_filename, filename + ".idx")
+
+
+def load_archive_index(filename=ARCHIVE_FILE):
+    """Read the whole archive index into a dict: recipient id -> (offset, length)
+    
+    Handy for reading many emails back; read_from_archive finds a single
+    one without it.
+    """
+    index = {}
+    with open(filename + ".idx", 'r', encoding='utf-8') as file:
+        for line in file:
+            recipient_id, offset, length = line.rstrip('\n').split('\t')
+            index[recipient_id] = (int(offset), int(length))   # Later entries win
+    return index
+
+
+def find_in_archive_index(recipient_id, filename=ARCHIVE_FILE):
+    """(offset, length) of a recipient's email from the sorted index, or None
+    
+    Binary search over byte positions: each probe reads the first whole
+    line at or after the position, so only about log2(file size) lines
+    are read.
+    """
+    key = index_key(recipient_id).encode('utf-8')
+    with open(filename + ".idx", 'rb') as file:
+        
+        def line_at(position):
+            file.seek(max(position - 1, 0))
+            if position:
+                file.readline()            # Rest of the line that holds position - 1
+            return file.readline()
+        
+        low, high = 0, file.seek(0, os.SEEK_END)
+        while low < high:
+            middle = (low + high) // 2
+            line = line_at(middle)
+            if line and line.split(b"\t", 1)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        
+        line = line_at(low)
+    fields = line.rstrip(b"\n").split(b"\t")
+    if len(fields) != 3 or fields[0] != key:
+        return None
+    return int(fields[1]), int(fields[2])
+
+
+def read_from_archive(recipient_id, filename=ARCHIVE_FILE, index=None):
+    """Read one email back by recipient id without scanning the archive
+    
+    index, if given, is a dict from load_archive_index; otherwise the
+    sorted index file is searched.
+    """
+    try:
+        if index is None:
+            entry = find_in_archive_index(recipient_id, filename)
+        else:
+            entry = index.get(index_key(recipient_id))
+        
+        if entry is None:
+            print(f"❌ No email for recipient '{recipient_id}' in {filename}")
+            return None
+        
+        offset, length = entry
+        with open(filename, 'rb') as file:
+            file.seek(offset + RECORD_HEADER.size)
+            return file.read(length).decode('utf-8')
+    except FileNotFoundError:
+        print(f"❌ Error: Archive '{filename}' not found!")
+        return None
+
+
 # ========== TEMPLATE SELECTION ==========
 def select_template():
     """Let user select from available templates"""
@@ -378,10 +1131,9 @@ def view_templates():
         print(f"\n📄 {template_file}")
         print("-"*50)
         
-        template = read_template(f"templates/{template_file}")
-        if template:
-            placeholders = find_placeholders(template)
-            print(f"Placeholders: {', '.join(sorted(placeholders))}")
+        cached = get_template(f"templates/{template_file}")
+        if cached and cached["text"]:
+            print(f"Placeholders: {', '.join(sorted(cached['placeholders']))}")
 
 
 def fill_single_email():
@@ -392,12 +1144,13 @@ def fill_single_email():
         return
     
     # Read template
-    template = read_template(template_file)
-    if not template:
+    cached = get_template(template_file)
+    if not cached or not cached["text"]:
         return
+    template = cached["text"]
     
     # Find placeholders
-    placeholders = find_placeholders(template)
+    placeholders = cached["placeholders"]
     display_placeholders(placeholders)
     
     # Get values
@@ -410,7 +1163,7 @@ def fill_single_email():
     save = input("\nSave this email? (yes/no): ").lower()
     if save in ['yes', 'y']:
         recipient_name = values.get('recipient_name', 'recipient')
-        filename = save_filled_email(fill_template(template, values), recipient_name)
+        filename = save_filled_email(render_template(cached["compiled"], values), recipient_name)
         
         if filename:
             print("\n✓ Email saved successfully!")
@@ -463,6 +1216,219 @@ def main():
         input("\nPress Enter to continue...")
 
 
+# ========== BENCHMARKS ==========
+def compare_render_paths(num_rows=100000, template_file="templates/job_application.txt"):
+    """Time per-row fill_template, per-row render_template and render_columns"""
+    cached = get_template(template_file)
+    if not cached or not cached["text"]:
+        return None
+    
+    template = cached["text"]
+    compiled = cached["compiled"]
+    placeholders = compiled["placeholders"]
+    rows = [{p: f"{p}_{i}" for p in placeholders} for i in range(num_rows)]
+    columns = {p: [row[p] for row in rows] for p in placeholders}
+    
+    timings = {}
+    start = time.perf_counter()
+    per_row = [fill_template(template, row) for row in rows]
+    timings["fill_template (per row)"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    compiled_rows = [render_template(compiled, row) for row in rows]
+    timings["render_template (per row)"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    columnar = render_columns(compiled, columns, num_rows)
+    timings["render_columns"] = time.perf_counter() - start
+    
+    assert per_row == compiled_rows == columnar, "render paths disagree"
+    
+    print(f"\nRendering {num_rows} emails from {template_file}:")
+    print("-"*50)
+    for name, seconds in timings.items():
+        print(f"{name:28} {seconds:8.3f}s  {num_rows / seconds:12,.0f} emails/s")
+    return timings
+
+
+def make_synthetic_template(template_size, num_slots):
+    """Build a template of about template_size characters with num_slots slots"""
+    slots = [f"field_{i}" for i in range(num_slots)]
+    filler = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. "
+    # Spread the literal text evenly between the slots
+    gap = max(1, template_size // (num_slots + 1))
+    literal = (filler * (gap // len(filler) + 1))[:gap]
+    
+    parts = [literal]
+    for slot in slots:
+        parts.append(f"{{{slot}}}")
+        parts.append(literal)
+    return "".join(parts), slots
+
+
+def write_synthetic_recipients(filename, slots, num_rows):
+    """Write a CSV with num_rows rows of predictable values for the slots"""
+    with open(filename, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(["recipient_id"] + slots)
+        for i in range(num_rows):
+            writer.writerow([i] + [f"{slot}_value_{i}" for slot in slots])
+
+
+def _run_benchmark_case(template_size, num_slots, num_rows, output, workers):
+    """Benchmark one configuration (runs in a fresh process for a clean peak RSS)"""
+    template, slots = make_synthetic_template(template_size, num_slots)
+    result = {"template_size": len(template), "slots": num_slots,
+              "recipients": num_rows, "output": output, "workers": workers}
+    
+    saved_folder = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)          # batch output goes to ./output
+        with open("template.txt", 'w') as file:
+            file.write(template)
+        write_synthetic_recipients("recipients.csv", slots, num_rows)
+        
+        # Micro timings of the building blocks
+        start = time.perf_counter()
+        for _ in range(1000):
+            find_placeholders(template)
+        result["find_placeholders_us"] = round((time.perf_counter() - start) * 1000, 3)
+        
+        values = {slot: f"{slot}_value" for slot in slots}
+        start = time.perf_counter()
+        for _ in range(1000):
+            fill_template(template, values)
+        result["fill_template_us"] = round((time.perf_counter() - start) * 1000, 3)
+        
+        # The whole pipeline, with per-stage timings
+        stats_file = os.path.join(folder, "stats.json")
+        archive_file = "output/emails.pack" if output == "archive" else None
+        with open(os.devnull, 'w') as quiet:
+            saved_stdout, sys.stdout = sys.stdout, quiet
+            try:
+                batch_fill_from_file("template.txt", "recipients.csv", workers=workers,
+                                     archive_file=archive_file, stats_file=stats_file)
+            finally:
+                sys.stdout = saved_stdout
+        with open(stats_file, 'r', encoding='utf-8') as file:
+            report = json.load(file)
+        os.chdir(saved_folder)
+    
+    seconds = report["seconds"]
+    rendered_bytes = report["stages"].get("render", {}).get("bytes", 0)
+    result.update({
+        "seconds": seconds,
+        "renders_per_second": report["emails_per_second"],
+        "bytes_per_second": round(rendered_bytes / seconds, 1) if seconds else None,
+        "peak_memory_mb": peak_memory_mb(),
+        "stages": report["stages"]
+    })
+    return result
+
+
+def run_benchmarks(recipient_counts=(1000, 10000, 100000), slot_counts=(5, 15),
+                   template_sizes=(1000, 10000), output="archive", workers=1,
+                   json_file=None):
+    """Benchmark the batch pipeline over a grid of sizes and print a table"""
+    results = []
+    print(f"\n{'template':>9} {'slots':>5} {'rows':>9} {'renders/s':>11} "
+          f"{'MB/s':>8} {'peak MB':>8}  stage seconds")
+    print("-"*80)
+    
+    for template_size in template_sizes:
+        for num_slots in slot_counts:
+            for num_rows in recipient_counts:
+                # A fresh process per case keeps peak memory figures independent
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    result = pool.submit(_run_benchmark_case, template_size, num_slots,
+                                         num_rows, output, workers).result()
+                results.append(result)
+                
+                stages = " ".join(f"{name}={stage['seconds']:.2f}"
+                                  for name, stage in result["stages"].items())
+                peak = result["peak_memory_mb"]
+                print(f"{result['template_size']:>9} {num_slots:>5} {num_rows:>9} "
+                      f"{result['renders_per_second'] or 0:>11,.0f} "
+                      f"{(result['bytes_per_second'] or 0) / 1e6:>8.1f} "
+                      f"{peak if peak is not None else float('nan'):>8.1f}  {stages}")
+    
+    if json_file:
+        with open(json_file, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+        print(f"\n✓ Results written to: {json_file}")
+    return results
+
+
+# ========== COMMAND LINE ==========
+def run_command_line(args):
+    """Run headless commands, e.g. `python EmailTemplateFiller.py batch T.txt people.csv`"""
+    parser = argparse.ArgumentParser(description="Email Template Filler (headless mode)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    batch = commands.add_parser("batch", help="fill a template for every row of a CSV/JSONL file")
+    batch.add_argument("template", help="template file, e.g. templates/job_application.txt")
+    batch.add_argument("recipients", help="recipient file (.csv, or .jsonl for JSON lines)")
+    batch.add_argument("--verbose", action="store_true", help="print every saved file")
+    batch.add_argument("--workers", type=int, default=1,
+                       help="number of worker processes (default: 1, no pool)")
+    batch.add_argument("--chunk-size", type=int, default=1000,
+                       help="rows rendered, or sent to a worker, at a time (default: 1000)")
+    batch.add_argument("--archive", nargs="?", const=ARCHIVE_FILE, default=None,
+                       help=f"pack emails into one archive file (default: {ARCHIVE_FILE})")
+    batch.add_argument("--smtp", metavar="HOST[:PORT]",
+                       help=f"send emails over SMTP to the '{RECIPIENT_EMAIL_COLUMN}' column")
+    batch.add_argument("--sender", default=DEFAULT_SENDER, help="From address for SMTP delivery")
+    batch.add_argument("--connections", type=int, default=4,
+                       help="SMTP connections used in parallel (default: 4)")
+    batch.add_argument("--incremental", action="store_true",
+                       help=f"only re-render rows that changed since the last run ({MANIFEST_FILE})")
+    batch.add_argument("--stats", metavar="FILE", help="write per-stage timings to a JSON file")
+    
+    read = commands.add_parser("read", help="print one email from an archive")
+    read.add_argument("recipient_id", help="recipient_id column value, or row number")
+    read.add_argument("--archive", default=ARCHIVE_FILE, help=f"archive file (default: {ARCHIVE_FILE})")
+    
+    bench = commands.add_parser("bench", help="benchmark the batch pipeline on synthetic data")
+    bench.add_argument("--recipients", type=int, nargs="+", default=[1000, 10000, 100000],
+                       help="recipient counts to try, e.g. 1000 1000000")
+    bench.add_argument("--slots", type=int, nargs="+", default=[5, 15], help="placeholders per template")
+    bench.add_argument("--template-size", type=int, nargs="+", default=[1000, 10000],
+                       help="template sizes in characters")
+    bench.add_argument("--output", choices=["archive", "files"], default="archive")
+    bench.add_argument("--workers", type=int, default=1)
+    bench.add_argument("--json", help="also save the results to this JSON file")
+    
+    bench_render = commands.add_parser("bench-render", help="compare per-row and columnar rendering")
+    bench_render.add_argument("--rows", type=int, default=100000, help="emails to render (default: 100000)")
+    bench_render.add_argument("--template", default="templates/job_application.txt")
+    
+    options = parser.parse_args(args)
+    
+    if options.command == "batch":
+        smtp_host, _, smtp_port = (options.smtp or "").partition(":")
+        batch_fill_from_file(options.template, options.recipients, verbose=options.verbose,
+                             workers=options.workers, chunk_size=options.chunk_size,
+                             archive_file=options.archive, smtp_host=smtp_host or None,
+                             smtp_port=int(smtp_port) if smtp_port else None,
+                             sender=options.sender, connections=options.connections,
+                             incremental=options.incremental, stats_file=options.stats)
+    
+    elif options.command == "read":
+        email = read_from_archive(options.recipient_id, options.archive)
+        if email is not None:
+            print(email)
+    
+    elif options.command == "bench":
+        run_benchmarks(options.recipients, options.slots, options.template_size,
+                       options.output, options.workers, options.json)
+    
+    elif options.command == "bench-render":
+        compare_render_paths(options.rows, options.template)
+
+
 # Run the program
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        run_command_line(sys.argv[1:])
+    else:
+        main()
\ No newline at end of file
@@ -4,7 +4,33 @@ Check length, uppercase, digits, special characters
 Teaches: strings, loops, regex (optional)
 """
 
+import argparse
+import bisect
+import csv
+import hashlib
+import heapq
+import io
+import json
+import math
+import mmap
+import os
 import re  # Regular expressions 
+import sys
+import tempfile
+import time
+import timeit
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+SPECIAL_CHARACTERS = "!@#$%^&*()_+-=[]{}|;:,.<>?/~`"        # Define what's special
+
+# Feedback for each check: (message when passed, message when missing)
+FEEDBACK = {
+    "uppercase": ("✓ Contains uppercase letters", "✗ Missing uppercase letters (A-Z)"),
+    "digits": ("✓ Contains numbers", "✗ Missing numbers (0-9)"),
+    "special": ("✓ Contains special characters", "✗ Missing special characters (!@#$%^&* etc.)")
+}
 
 # ========== METHOD 1: USING LOOPS ==========
 def check_length(password):
@@ -25,9 +51,9 @@ def check_uppercase(password):
             break                  # Exit loop immediately (no need to check more)
 
     if has_upper:
-        return True, "✓ Contains uppercase letters"
+        return True, FEEDBACK["uppercase"][0]
     else:
-        return False, "✗ Missing uppercase letters (A-Z)"
+        return False, FEEDBACK["uppercase"][1]
 
 
 def check_digits(password):
@@ -39,40 +65,281 @@ def check_digits(password):
             break                     # Stop! No need to look for more digits
     
     if has_digit:
-        return True, "✓ Contains numbers"
+        return True, FEEDBACK["digits"][0]
     else:
-        return False, "✗ Missing numbers (0-9)"
+        return False, FEEDBACK["digits"][1]
 
 
 def check_special_chars(password):
     """Check if password contains special characters"""
-    special_characters = "!@#$%^&*()_+-=[]{}|;:,.<>?/~`"        # Define what's special
     has_special = False                      # Start by assuming no special character
     
     for char in password:                    # Loop through each character in the password  
-        if char in special_characters:       # Check if a chac=racter exist in the special string
+        if char in SPECIAL_CHARACTERS:       # Check if a chac=racter exist in the special string
             has_special = True               # Found One! 
             break                            # Stop! No need to look for more special characters
     
     if has_special:
-        return True, "✓ Contains special characters"
+        return True, FEEDBACK["special"][0]
     else:
-        return False, "✗ Missing special characters (!@#$%^&* etc.)"
+        return False, FEEDBACK["special"][1]
 
 
 # ========== METHOD 2: USING REGEX (ADVANCED) ==========
+# The patterns are compiled once here rather than looked up in re's cache on
+# every call. For an all-ASCII password the four searches are fused into one
+# pass: a bytes.translate() table, built from the same patterns, marks every
+# character with the check it passes and `in` finds each mark (both in C).
+# Long passwords are marked a chunk at a time, stopping once all checks pass.
+REGEX_CHUNK_CHARACTERS = 4096
+REGEX_CHECKS = {
+    "uppercase": re.compile(r'[A-Z]'),     # Search for uppercase letter in the string
+    "lowercase": re.compile(r'[a-z]'),
+    "digits": re.compile(r'\d'),           # Search if there exist any digit in the string
+    "special": re.compile(r'[!@#$%^&*()_+\-=\[\]{}|;:,.<>?/~`]')
+}
+REGEX_CHECK_MARKS = {"uppercase": b"U", "lowercase": b"L", "digits": b"D", "special": b"S"}
+REGEX_CLASS_TABLE = bytes(
+    next((ord(REGEX_CHECK_MARKS[name]) for name, pattern in REGEX_CHECKS.items()
+          if pattern.match(chr(code))), ord("O"))
+    for code in range(256))
+
+
+def search_password_regex(password):
+    """One precompiled regex search per check (works for any text)"""
+    checks = {"length": len(password) >= 8}
+    for name, pattern in REGEX_CHECKS.items():
+        checks[name] = pattern.search(password) is not None
+    return checks
+
+
 def check_password_regex(password):
     """Alternative method using regular expressions instead of loops"""
+    if len(password) > REGEX_CHUNK_CHARACTERS:
+        return check_long_password_regex(password)
+    if not password.isascii():
+        return search_password_regex(password)      # \d also matches non-ASCII digits
+    classes = password.encode("ascii").translate(REGEX_CLASS_TABLE)
     checks = {
         "length": len(password) >= 8,
-        "uppercase": bool(re.search(r'[A-Z]', password)),     # Search for uppercase letter in the string
-        "lowercase": bool(re.search(r'[a-z]', password)),
-        "digits": bool(re.search(r'\d', password)),            # Search if there exist any digit in the string
-        "special": bool(re.search(r'[!@#$%^&*()_+\-=\[\]{}|;:,.<>?/~`]', password))
+        "uppercase": b"U" in classes,
+        "lowercase": b"L" in classes,
+        "digits": b"D" in classes,
+        "special": b"S" in classes
     }
     return checks
 
 
+def check_long_password_regex(password):
+    """check_password_regex a chunk at a time, stopping once every check has passed"""
+    missing = dict(REGEX_CHECK_MARKS)
+    for start in range(0, len(password), REGEX_CHUNK_CHARACTERS):
+        chunk = password[start:start + REGEX_CHUNK_CHARACTERS]
+        if chunk.isascii():
+            classes = chunk.encode("ascii").translate(REGEX_CLASS_TABLE)
+            passed = [name for name, mark in missing.items() if mark in classes]
+        else:
+            passed = [name for name in missing if REGEX_CHECKS[name].search(chunk)]
+        for name in passed:
+            del missing[name]
+        if not missing:
+            break
+    
+    checks = {"length": len(password) >= 8}
+    for name in REGEX_CHECK_MARKS:
+        checks[name] = name not in missing
+    return checks
+
+
+# ========== METHOD 3: SINGLE PASS (LOOKUP TABLE) ==========
+# Instead of one loop per check, every character is swapped for a letter naming
+# its class (U = uppercase, L = lowercase, D = digit, S = special, O = other)
+# in a single translate() pass, done in C. Counting a class is then a fast
+# count() of its letter.
+def character_class(char):
+    """The class letter of one character (same rules as METHOD 1)"""
+    if char.isupper():
+        return "U"
+    if char.islower():
+        return "L"
+    if char.isdigit():
+        return "D"
+    if char in SPECIAL_CHARACTERS:
+        return "S"
+    return "O"
+
+
+class CharacterClassTable(dict):
+    """str.translate() table: character code -> class letter, filled in on first sight"""
+    
+    def __missing__(self, code):
+        letter = self[code] = character_class(chr(code))
+        return letter
+
+
+# bytes.translate() table for the usual all-ASCII password
+ASCII_CLASS_TABLE = bytes(ord(character_class(chr(code))) if code < 128 else ord("O")
+                          for code in range(256))
+CHARACTER_CLASS_TABLE = CharacterClassTable()
+
+
+def classify_password(password):
+    """Count the characters of each class: {"uppercase": n, "lowercase": n, ...}"""
+    if password.isascii():
+        classes = password.encode("ascii").translate(ASCII_CLASS_TABLE)
+    else:
+        classes = password.translate(CHARACTER_CLASS_TABLE).encode("ascii")
+    count = classes.count
+    return {"uppercase": count(b"U"), "lowercase": count(b"L"),
+            "digits": count(b"D"), "special": count(b"S")}
+
+
+# ========== LEAKED / COMMON PASSWORD BLOCKLIST ==========
+# A blocklist of leaked or common passwords is compiled (build_blocklist) into
+# a file of sorted 8-byte hashes. The file is memory-mapped, not loaded, and a
+# password is looked up by binary search over it, so even a list of many
+# millions costs nothing at startup and a few microseconds per check.
+BLOCKLIST_FILE = "blocklist.idx"
+BLOCKLIST_MAGIC = b"PWBLOCK1"
+BLOCKLIST_HEADER_BYTES = 16           # Magic, byte order, padding
+BLOCKLIST_SORT_CHUNK = 1000000        # Hashes sorted in memory at a time when building
+BLOCKED_SCORE = 10                    # Score given to a blocklisted password
+BLOCKLIST_RETRY_SECONDS = 5           # How often a missing or bad blocklist is looked for again
+
+_blocklists = {}                      # filename -> (mmap, hashes), once opened
+_blocklist_retries = {}               # filename -> (when to look again, problem reported)
+
+
+def password_hash(password_bytes):
+    """64-bit hash of a password's bytes, as stored in the blocklist"""
+    return int.from_bytes(hashlib.blake2b(password_bytes, digest_size=8).digest(), "big")
+
+
+def map_blocklist(filename):
+    """Map a blocklist file: (mmap, hashes); ValueError if it is not a usable blocklist"""
+    with open(filename, 'rb') as file:
+        if os.fstat(file.fileno()).st_size < BLOCKLIST_HEADER_BYTES:
+            raise ValueError(f"{filename} is not a blocklist (see build-blocklist)")
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    header = mapped[:BLOCKLIST_HEADER_BYTES]
+    problem = None
+    if not header.startswith(BLOCKLIST_MAGIC):
+        problem = f"{filename} is not a blocklist (see build-blocklist)"
+    elif header[8:9] != sys.byteorder[0].encode():
+        problem = f"{filename} was built on a different kind of machine; rebuild it"
+    if problem:
+        mapped.close()
+        raise ValueError(problem)
+    # Hashes are stored in native byte order so they can be read in place
+    return mapped, memoryview(mapped)[BLOCKLIST_HEADER_BYTES:].cast("Q")
+
+
+def open_blocklist(filename=BLOCKLIST_FILE):
+    """The sorted hashes of a blocklist file (mapped on first use; None if missing or bad)
+    
+    Only a successful open is kept. A missing or bad file is looked for
+    again every BLOCKLIST_RETRY_SECONDS, so a blocklist built later by
+    another program is picked up; a bad one is reported once, not on
+    every check.
+    """
+    entry = _blocklists.get(filename)
+    if entry is not None:
+        return entry[1]
+    
+    now = time.monotonic()
+    retry = _blocklist_retries.get(filename)
+    if retry is not None and now < retry[0]:
+        return None
+    try:
+        entry = map_blocklist(filename)
+    except FileNotFoundError:
+        problem = None
+    except (OSError, ValueError) as e:
+        problem = str(e)
+    else:
+        _blocklists[filename] = entry
+        _blocklist_retries.pop(filename, None)
+        return entry[1]
+    
+    if problem and (retry is None or retry[1] != problem):
+        print(f"⚠ Scoring without the blocklist: {problem}")
+    _blocklist_retries[filename] = (now + BLOCKLIST_RETRY_SECONDS, problem)
+    return None
+
+
+def is_blocklisted(password, filename=BLOCKLIST_FILE):
+    """True if the password is in the blocklist (False when there is no blocklist)"""
+    hashes = open_blocklist(filename)
+    if hashes is None:
+        return False
+    value = password_hash(password.encode("utf-8", "surrogateescape"))
+    position = bisect.bisect_left(hashes, value)
+    return position < len(hashes) and hashes[position] == value
+
+
+def _sorted_hash_runs(lines, folder):
+    """Hash lines in chunks, sort each chunk, and save it; yield the saved file names"""
+    chunk = array("Q")
+    for line in lines:
+        password = line.rstrip(b"\r\n")
+        if password:
+            chunk.append(password_hash(password))
+        if len(chunk) >= BLOCKLIST_SORT_CHUNK:
+            yield _save_run(chunk, folder)
+            chunk = array("Q")
+    if chunk:
+        yield _save_run(chunk, folder)
+
+
+def _save_run(chunk, folder):
+    run_file = os.path.join(folder, f"run{len(os.listdir(folder))}.bin")
+    with open(run_file, 'wb') as file:
+        array("Q", sorted(chunk)).tofile(file)
+    return run_file
+
+
+def _read_run(run_file):
+    """Yield the hashes of a sorted run a block at a time"""
+    with open(run_file, 'rb') as file:
+        while True:
+            block = array("Q")
+            block.frombytes(file.read(8 * 65536))
+            if not block:
+                return
+            yield from block
+
+
+def build_blocklist(source, filename=BLOCKLIST_FILE):
+    """Compile a text password list (one per line) into a blocklist file; return its size"""
+    count = 0
+    with tempfile.TemporaryDirectory() as folder:
+        with open(source, 'rb') as lines:
+            runs = list(_sorted_hash_runs(lines, folder))
+        
+        temp_file = f"{filename}.{os.getpid()}.tmp"
+        with open(temp_file, 'wb') as file:
+            file.write(BLOCKLIST_MAGIC + sys.byteorder[0].encode().ljust(8, b"\0"))
+            # Merge the sorted runs, dropping duplicates, writing a block at a time
+            block = array("Q")
+            previous = None
+            for value in heapq.merge(*(_read_run(run) for run in runs)):
+                if value != previous:
+                    block.append(value)
+                    previous = value
+                    if len(block) >= 65536:
+                        count += len(block)
+                        block.tofile(file)
+                        block = array("Q")
+            count += len(block)
+            block.tofile(file)
+    
+    # Swap in the complete file in one step, and forget any mapping of the old one
+    _blocklists.pop(filename, None)
+    _blocklist_retries.pop(filename, None)
+    os.replace(temp_file, filename)
+    return count
+
+
 # ========== STRENGTH CALCULATION ==========
 def calculate_strength(password):
     """Calculate overall password strength"""
@@ -87,11 +354,15 @@ def calculate_strength(password):
         length_msg = ✓ Length: 8 characters (Good!) 
     """
 
-    # Run all checks
+    # Run all checks (one pass over the password finds every character class)
+    counts = classify_password(password)
     length_ok, length_msg = check_length(password)
-    upper_ok, upper_msg = check_uppercase(password)
-    digit_ok, digit_msg = check_digits(password)
-    special_ok, special_msg = check_special_chars(password)
+    upper_ok = counts["uppercase"] > 0
+    digit_ok = counts["digits"] > 0
+    special_ok = counts["special"] > 0
+    upper_msg = FEEDBACK["uppercase"][not upper_ok]
+    digit_msg = FEEDBACK["digits"][not digit_ok]
+    special_msg = FEEDBACK["special"][not special_ok]
     
     # Add to feedback list
     feedback.append(length_msg)
@@ -109,6 +380,11 @@ def calculate_strength(password):
     if special_ok:
         score += 25
     
+    # However it is built, a password from a leaked/common list is guessed first
+    if is_blocklisted(password):
+        score = min(score, BLOCKED_SCORE)
+        feedback.append("✗ Found in a list of leaked or common passwords")
+    
     return score, feedback
 
 
@@ -126,6 +402,352 @@ def get_strength_rating(score):
         return "✗ VERY WEAK", "red"
 
 
+# ========== METHOD 4: ENTROPY ESTIMATE (PATTERN MATCHING) ==========
+# Character classes say little about how fast a password falls to a guessing
+# attack: "P@ssw0rd1!" ticks every box. This method looks for what attackers
+# try first (common words, also in l33t spelling, keyboard walks, repeats,
+# sequences and dates), then finds the cheapest way to build the password
+# from those pieces plus brute-forced characters. The cost, in bits of
+# entropy (log2 of guesses), becomes a 0-100 score for get_strength_rating.
+#
+# Each matcher takes the password and returns matches as
+# (start, end, kind, bits); add functions to PATTERN_MATCHERS to plug in more.
+FULL_SCORE_BITS = 80        # Entropy that earns a score of 100
+MIN_WORD_LENGTH = 3
+DICTIONARY_FILE = "words.txt"   # Optional extra words, most common first, one per line
+COMMON_WORDS = (
+    "password", "qwerty", "dragon", "monkey", "letmein", "football", "iloveyou", "admin",
+    "welcome", "login", "princess", "sunshine", "master", "shadow", "baseball", "superman",
+    "hello", "freedom", "whatever", "trustno", "starwars", "batman", "secret", "summer",
+    "winter", "spring", "autumn", "love", "money", "jesus", "ninja", "mustang", "access",
+    "charlie", "jordan", "hunter", "killer", "pepper", "ginger", "soccer", "hockey", "ranger",
+    "buster", "thomas", "robert", "daniel", "jessica", "ashley", "michael", "matthew",
+    "andrew", "joshua", "michelle", "jennifer", "computer", "internet", "cookie", "chocolate",
+    "cheese", "banana", "orange", "apple", "flower", "tiger", "bailey", "harley", "maggie",
+    "pass", "word", "user", "test", "guest", "root", "abc", "god", "angel",
+    "lovely", "family", "friend", "happy", "purple", "silver", "golden", "diamond", "blue",
+    "black", "red", "green", "yellow", "dog", "cat", "fish", "bear", "lion", "eagle", "house",
+    "home", "school", "player", "game", "gamer", "music", "rock", "star", "sun",
+    "moon", "night", "day", "time", "life", "world", "king", "queen", "prince", "baby",
+    "boy", "girl", "man", "woman", "the", "and", "you", "for", "with", "this", "that",
+    "change", "default", "company", "office", "system", "server", "market", "secure",
+    "london", "paris", "berlin", "america", "canada", "india", "china", "google",
+    "samsung", "microsoft", "windows", "linux", "mobile", "phone", "email", "mail", "shop",
+)
+L33T_LETTERS = {"4": "a", "@": "a", "8": "b", "(": "c", "3": "e", "6": "g", "1": "il",
+                "!": "i", "|": "il", "0": "o", "9": "g", "$": "s", "5": "s", "7": "t",
+                "+": "t", "2": "z", "%": "x"}
+KEYBOARD_ROWS = ("`1234567890-=", "qwertyuiop[]\\", "asdfghjkl;'", "zxcvbnm,./")
+KEYBOARD_SHIFTED_ROWS = ("~!@#$%^&*()_+", "QWERTYUIOP{}|", 'ASDFGHJKL:"', "ZXCVBNM<>?")
+SHIFTED_KEYS = frozenset("".join(KEYBOARD_SHIFTED_ROWS))
+KEYBOARD_KEYS = len(KEYBOARD_ROWS[0] + KEYBOARD_ROWS[1] + KEYBOARD_ROWS[2] + KEYBOARD_ROWS[3])
+KEYBOARD_TURN_CHOICES = 4   # Roughly how many neighbours a walk can turn to
+DATE_PATTERNS = (
+    # (pattern, guesses): years 1900-2099, then day/month/year in either order
+    (re.compile(r'(?<!\d)(?:19|20)\d\d(?!\d)'), 200),
+    (re.compile(r'(?<!\d)\d{1,2}([-/._ ]?)\d{1,2}\1(?:\d\d|(?:19|20)\d\d)(?!\d)'), 31 * 12 * 200),
+    (re.compile(r'(?<!\d)(?:19|20)\d\d([-/._ ]?)\d{1,2}\1\d{1,2}(?!\d)'), 31 * 12 * 200),
+)
+# Brute-force alphabet size for each character class (see classify_password)
+CLASS_ALPHABETS = {"uppercase": 26, "lowercase": 26, "digits": 10, "special": 33}
+
+_patterns = {}              # Word trie and regex, keyboard neighbours; built once on first use
+
+
+def keyboard_positions():
+    """char -> (row, x); rows are staggered by half a key"""
+    positions = {}
+    for rows in (KEYBOARD_ROWS, KEYBOARD_SHIFTED_ROWS):
+        for row, keys in enumerate(rows):
+            for column, key in enumerate(keys):
+                positions[key] = (row, column + row / 2)
+    return positions
+
+
+def keyboard_steps():
+    """{"qw": direction, ...} for every pair of neighbouring keys"""
+    positions = keyboard_positions()
+    steps = {}
+    for first, (row1, x1) in positions.items():
+        for second, (row2, x2) in positions.items():
+            step = (row2 - row1, x2 - x1)
+            if (step[0] == 0 and abs(step[1]) == 1) or (abs(step[0]) == 1 and abs(step[1]) == 0.5):
+                steps[first + second] = step
+    return steps
+
+
+def load_word_trie():
+    """Trie of COMMON_WORDS and DICTIONARY_FILE: nested dicts, "" -> rank at word ends"""
+    words = list(COMMON_WORDS)
+    if os.path.exists(DICTIONARY_FILE):
+        with open(DICTIONARY_FILE, 'r', encoding='utf-8', errors='replace') as file:
+            words.extend(line.strip().lower() for line in file)
+    
+    trie = {}
+    for rank, word in enumerate(words, start=1):
+        if len(word) < MIN_WORD_LENGTH:
+            continue
+        node = trie
+        for letter in word:
+            node = node.setdefault(letter, {})
+        node.setdefault("", rank)            # Keep the best (lowest) rank of a repeated word
+    return trie
+
+
+def word_pattern(trie):
+    """One regex finding the longest word at every position of a lowercased password
+    
+    It follows the trie ("pass(?:word)?|..."), so the regex engine takes one
+    branch per character instead of trying every word, and each letter is a
+    class of the characters that can stand for it ("[a4@]"), so l33t
+    spellings are found too.
+    """
+    stand_ins = {}
+    for char, letters in L33T_LETTERS.items():
+        for letter in letters:
+            stand_ins[letter] = stand_ins.get(letter, "") + char
+    
+    def branch(node):
+        branches = [(f"[{re.escape(letter + stand_ins[letter])}]" if letter in stand_ins
+                     else re.escape(letter)) + branch(child)
+                    for letter, child in node.items() if letter]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body     # Longer words are tried first
+    
+    # The lookahead matches nothing itself, so a word is looked for at every position
+    return re.compile(f"(?=({branch(trie)}))")
+
+
+def patterns():
+    """The cached word trie, word regex and keyboard neighbours"""
+    if not _patterns:
+        _patterns["words"] = load_word_trie()
+        _patterns["word_pattern"] = word_pattern(_patterns["words"])
+        _patterns["keyboard_steps"] = keyboard_steps()
+    return _patterns
+
+
+def word_ends(trie, text):
+    """{length: bits} for the words text starts with (rank, plus one bit per l33t letter)"""
+    ends = {}
+    if text.isalpha():                   # No l33t characters: a single path to follow
+        node = trie
+        for length, char in enumerate(text, start=1):
+            node = node[char]
+            if "" in node and length >= MIN_WORD_LENGTH:
+                ends[length] = math.log2(node[""])
+        return ends
+    stack = [(trie, 0, 0)]               # (trie node, characters read, l33t substitutions)
+    while stack:
+        node, length, subs = stack.pop()
+        if "" in node and length >= MIN_WORD_LENGTH:
+            bits = math.log2(node[""]) + subs
+            if bits < ends.get(length, bits + 1):
+                ends[length] = bits
+        if length < len(text):
+            char = text[length]
+            if char in node:
+                stack.append((node[char], length + 1, subs))
+            for letter in L33T_LETTERS.get(char, ""):
+                if letter in node:
+                    stack.append((node[letter], length + 1, subs + 1))
+    return ends
+
+
+def match_dictionary(password):
+    """Common words anywhere in the password, in any case and in l33t spelling"""
+    found = patterns()
+    trie = found["words"]
+    lowered = password.lower()
+    if len(lowered) != len(password):
+        lowered = password               # Rare letters whose lowercase is longer ("İ")
+    matches = []
+    # The regex finds where words start, in C; the trie is only walked there,
+    # along the longest word, to also score the shorter words inside it
+    # ("prince" in "princess"), which may split the rest of the password better
+    for match in found["word_pattern"].finditer(lowered):
+        start = match.start()
+        for length, bits in word_ends(trie, match.group(1)).items():
+            piece = password[start:start + length]
+            uppers = sum(map(str.isupper, piece))
+            # Capitalised or ALL CAPS adds one choice; other mixes add more
+            case_bits = (0 if not uppers else
+                         1 if uppers == len(piece) or (uppers == 1 and piece[0].isupper())
+                         else min(uppers, len(piece) - uppers) + 1)
+            matches.append((start, start + length, "word", bits + case_bits))
+    return matches
+
+
+def match_keyboard(password):
+    """Walks along neighbouring keys, like "qwerty" or "zaq1@WSX" """
+    steps = patterns()["keyboard_steps"]
+    # Direction of each move from one character to the next (None: not neighbours)
+    moves = list(map(steps.get, map(str.__add__, password, password[1:])))
+    matches = []
+    if b"\1\1\1" not in bytes(map(bool, moves)):
+        return matches                   # No three moves in a row (the usual case)
+    start = 0
+    while start < len(moves):
+        if moves[start] is None:
+            start += 1
+            continue
+        end, turns = start + 1, 0
+        while end < len(moves) and moves[end] is not None:
+            turns += moves[end] != moves[end - 1]
+            end += 1
+        keys = end - start + 1
+        if keys >= 4:
+            shifted = any(char in SHIFTED_KEYS for char in password[start:start + keys])
+            bits = (math.log2(KEYBOARD_KEYS * keys)
+                    + turns * math.log2(KEYBOARD_TURN_CHOICES) + shifted)
+            matches.append((start, start + keys, "keyboard", bits))
+        start = end
+    return matches
+
+
+def match_repeats(password):
+    """The same character or chunk over and over, like "aaaa" or "abcabc" """
+    matches = []
+    # Any repeat ("aaa", "abab") has some pair of characters twice: rule it out quickly
+    pairs = list(map(str.__add__, password, password[1:]))
+    if len(set(pairs)) == len(pairs):
+        return matches
+    start = 0
+    while start < len(password) - 1:
+        # A chunk repeats only where its first character comes again: try those
+        # distances, shortest first, instead of every chunk length
+        char, length, copies = password[start], 0, 0
+        next_start = password.find(char, start + 1)
+        while 0 < next_start - start <= (len(password) - start) // 2:
+            length = next_start - start
+            chunk = password[start:next_start]
+            if password.startswith(chunk, next_start):
+                copies = 2
+                while password.startswith(chunk, start + copies * length):
+                    copies += 1
+                break
+            next_start = password.find(char, next_start + 1)
+        
+        if not copies:
+            start += 1
+            continue
+        end = start + length * copies
+        if end - start >= 3:
+            bits = brute_force_bits(password[start:start + length]) + math.log2(copies)
+            matches.append((start, end, "repeat", bits))
+        start = end
+    return matches
+
+
+def match_sequences(password):
+    """Runs like "abcd", "9876" or "xyz" (each character one step from the last)"""
+    codes = list(map(ord, password))
+    steps = list(map(int.__sub__, codes[1:], codes))
+    matches = []
+    step_pairs = set(zip(steps, steps[1:]))
+    if (1, 1) not in step_pairs and (-1, -1) not in step_pairs:
+        return matches                   # No run of three
+    start = 0
+    while start < len(steps):
+        step = steps[start]
+        end = start + 1
+        if step in (-1, 1):
+            while end < len(steps) and steps[end] == step:
+                end += 1
+        length = end - start + 1
+        if length >= 3:
+            first = password[start]
+            starts = 10 if first.isdigit() else 26 if first.isalpha() else 95
+            bits = math.log2(starts * length * 2)      # * 2: up or down
+            matches.append((start, start + length, "sequence", bits))
+        start = end
+    return matches
+
+
+def match_dates(password):
+    """Years and dates, like "1987" or "12-05-1987" """
+    matches = []
+    if not REGEX_CHECKS["digits"].search(password):
+        return matches                   # No digits, no dates (the usual passphrase)
+    for pattern, guesses in DATE_PATTERNS:
+        for match in pattern.finditer(password):
+            separator = 2 if match.groups() and match.group(1) else 0
+            matches.append((match.start(), match.end(), "date", math.log2(guesses) + separator))
+    return matches
+
+
+PATTERN_MATCHERS = [match_dictionary, match_keyboard, match_repeats, match_sequences, match_dates]
+
+
+def brute_force_bits(text):
+    """Bits needed to guess text character by character"""
+    counts = classify_password(text)
+    alphabet = sum(size for name, size in CLASS_ALPHABETS.items() if counts[name])
+    if sum(counts.values()) < len(text):
+        alphabet += 100                  # Characters outside the usual classes
+    return len(text) * math.log2(alphabet or 1)
+
+
+def estimate_entropy(password):
+    """Lowest-cost split of the password into patterns: (bits, [(start, end, kind, bits)])"""
+    matches = [match for matcher in PATTERN_MATCHERS for match in matcher(password)]
+    ending_at = {}
+    for match in matches:
+        ending_at.setdefault(match[1], []).append(match)
+    char_bits = brute_force_bits(password) / len(password) if password else 0
+    
+    # best[i]: fewest bits to produce the first i characters, using last[i] to end them
+    best = [0.0] * (len(password) + 1)
+    last = [None] * (len(password) + 1)
+    for end in range(1, len(password) + 1):
+        best[end] = best[end - 1] + char_bits             # One brute-forced character
+        for match in ending_at.get(end, ()):
+            bits = best[match[0]] + match[3]
+            if bits < best[end]:
+                best[end], last[end] = bits, match
+    
+    # Walk back to list the patterns used
+    used = []
+    position = len(password)
+    while position > 0:
+        match = last[position]
+        if match is None:
+            position -= 1
+        else:
+            used.append(match)
+            position = match[0]
+    return best[-1], used[::-1]
+
+
+PATTERN_FEEDBACK = {
+    "word": "✗ Contains a common word",
+    "keyboard": "✗ Contains a keyboard pattern",
+    "repeat": "✗ Contains repeated characters",
+    "sequence": "✗ Contains a sequence",
+    "date": "✗ Contains a date or year"
+}
+
+
+def calculate_entropy_strength(password):
+    """Score a password by estimated guessing entropy; same (score, feedback) as calculate_strength"""
+    bits, used = estimate_entropy(password)
+    score = min(100, round(bits * 100 / FULL_SCORE_BITS))
+    feedback = [f"{'✓' if score >= 70 else '✗'} Estimated entropy: {bits:.1f} bits"]
+    for start, end, kind, match_bits in used:
+        feedback.append(f"{PATTERN_FEEDBACK[kind]}: '{password[start:end]}'")
+    
+    if is_blocklisted(password):
+        score = min(score, BLOCKED_SCORE)
+        feedback.append("✗ Found in a list of leaked or common passwords")
+    return score, feedback
+
+
+# Scoring methods that return (score 0-100, feedback) for get_strength_rating
+SCORERS = {"classes": calculate_strength, "entropy": calculate_entropy_strength}
+
+
 # ========== DISPLAY FUNCTIONS ==========
 def display_results(password, score, feedback, rating):
     """Display the analysis results"""
@@ -153,6 +775,224 @@ def generate_suggestions(score):
         print()
 
 
+# ========== BULK AUDIT ==========
+# Scores every password in a (possibly huge) newline-separated file. The file
+# is read in blocks of whole lines; each block is scored on its own (in worker
+# processes when asked) and only a few blocks are in memory at any time.
+AUDIT_BLOCK_BYTES = 1024 * 1024
+AUDIT_CHECKS = ("length", "uppercase", "lowercase", "digits", "special")   # check_password_regex
+AUDIT_FIELDS = ("line", "characters", "score", "rating") + AUDIT_CHECKS
+# get_strength_rating's labels, strongest first
+RATING_LABELS = [get_strength_rating(score)[0] for score in (90, 70, 50, 30, 0)]
+
+
+def read_password_blocks(filename, block_bytes=AUDIT_BLOCK_BYTES):
+    """Yield (first line number, bytes) blocks of whole lines ("-" = standard input)"""
+    file = sys.stdin.buffer if filename == "-" else open(filename, 'rb')
+    try:
+        line_number = 1
+        leftover = b""
+        while True:
+            data = file.read(block_bytes)
+            if not data:
+                break
+            data = leftover + data
+            cut = data.rfind(b"\n") + 1          # Keep a cut-off last line for the next block
+            if cut == 0:
+                leftover = data
+                continue
+            block, leftover = data[:cut], data[cut:]
+            yield line_number, block
+            line_number += block.count(b"\n")
+        if leftover:
+            yield line_number, leftover
+    finally:
+        if file is not sys.stdin.buffer:
+            file.close()
+
+
+def new_audit_summary():
+    """Empty totals for an audit"""
+    return {
+        "passwords": 0,
+        "ratings": dict.fromkeys(RATING_LABELS, 0),     # get_strength_rating buckets
+        "scores": {},                                   # score -> passwords
+        "checks": dict.fromkeys(AUDIT_CHECKS, 0)        # check -> passwords passing it
+    }
+
+
+def merge_audit_summary(total, part):
+    """Add one block's summary to the running totals"""
+    total["passwords"] += part["passwords"]
+    for key in ("ratings", "scores", "checks"):
+        for name, count in part[key].items():
+            total[key][name] = total[key].get(name, 0) + count
+
+
+def audit_block(first_line, block, with_rows=True, include_passwords=False, scorer="classes"):
+    """Score every password in a block; return (CSV rows as text, summary)"""
+    score_password = SCORERS[scorer]
+    output = io.StringIO()
+    writer = csv.writer(output)
+    summary = new_audit_summary()
+    ratings, scores, passed = summary["ratings"], summary["scores"], summary["checks"]
+    
+    for line_number, raw in enumerate(block.split(b"\n"), start=first_line):
+        # Invalid UTF-8 is kept byte for byte (as surrogates), the way
+        # build_blocklist hashed it and is_blocklisted encodes it again
+        password = raw.rstrip(b"\r").decode("utf-8", "surrogateescape")
+        if not password:
+            continue                     # Blank line
+        score, feedback = score_password(password)
+        rating = get_strength_rating(score)[0]
+        checks = check_password_regex(password)
+        
+        summary["passwords"] += 1
+        ratings[rating] += 1
+        scores[score] = scores.get(score, 0) + 1
+        for name, ok in checks.items():
+            passed[name] += ok
+        
+        if with_rows:
+            row = [line_number, len(password), score, rating] + [int(ok) for ok in checks.values()]
+            if include_passwords:
+                row.append(password)
+            writer.writerow(row)
+    
+    return output.getvalue(), summary
+
+
+def audit_results(filename, workers=1, block_bytes=AUDIT_BLOCK_BYTES, with_rows=True,
+                  include_passwords=False, scorer="classes"):
+    """Yield audit_block results for each block of the file, in file order"""
+    blocks = read_password_blocks(filename, block_bytes)
+    if workers <= 1:
+        for first_line, block in blocks:
+            yield audit_block(first_line, block, with_rows, include_passwords, scorer)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for first_line, block in blocks:
+            pending.append(pool.submit(audit_block, first_line, block, with_rows,
+                                       include_passwords, scorer))
+            # Read ahead at most two blocks per worker, however big the file
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def audit_passwords(filename, output_file=None, workers=1, block_bytes=AUDIT_BLOCK_BYTES,
+                    include_passwords=False, scorer="classes"):
+    """Score every password in a file, write per-line results, return the totals"""
+    summary = new_audit_summary()
+    output = (open(output_file, 'w', newline='', encoding='utf-8', errors='surrogateescape')
+              if output_file else None)
+    try:
+        if output:
+            csv.writer(output).writerow(AUDIT_FIELDS + (("password",) if include_passwords else ()))
+        for rows, part in audit_results(filename, workers, block_bytes, output is not None,
+                                        include_passwords, scorer):
+            if output:
+                output.write(rows)
+            merge_audit_summary(summary, part)
+    finally:
+        if output:
+            output.close()
+    return summary
+
+
+def display_audit_summary(summary):
+    """Print rating and score histograms for an audit"""
+    total = summary["passwords"] or 1
+    print("       PASSWORD AUDIT SUMMARY")
+    print("="*50)
+    print(f"\nPasswords checked: {summary['passwords']:,}")
+    
+    print("\nRATINGS:")
+    print("-"*50)
+    for label, count in summary["ratings"].items():
+        bar = "█" * round(30 * count / total)
+        print(f"{label:<16} {count:>12,} {100 * count / total:>6.1f}%  {bar}")
+    
+    print("\nSCORES:")
+    print("-"*50)
+    for score, count in sorted(summary["scores"].items(), key=lambda item: int(item[0])):
+        print(f"{score:>3}/100 {count:>12,} {100 * count / total:>6.1f}%")
+    
+    print("\nCHECKS PASSED:")
+    print("-"*50)
+    for name, count in summary["checks"].items():
+        print(f"{name:<16} {count:>12,} {100 * count / total:>6.1f}%")
+
+
+# ========== BENCHMARK ==========
+# Times the character checks on short and very long inputs, e.g.
+# `python PasswordStrengthChecker.py bench`. "Worst case" passwords have only
+# lowercase letters, so no check can stop early and every method reads the
+# whole text. The entropy scorer is timed separately on a few realistic
+# passwords and passphrases, since it is meant for those, not megabytes.
+BENCHMARK_LENGTHS = (12, 1000, 1000000)
+ENTROPY_BENCHMARK_PASSWORDS = (("typical", "Tr0ub4dor&3x"),
+                               ("passphrase", "correcthorsebatterystaple"),
+                               ("l33t phrase", "myd0gl1kesp1zzaa11night"))
+
+
+def check_password_loops(password):
+    """All the METHOD 1 checks (loops) for one password"""
+    return (check_length(password), check_uppercase(password),
+            check_digits(password), check_special_chars(password))
+
+
+BENCHMARK_METHODS = {
+    "loops (method 1)": check_password_loops,
+    "regex, one search per check": search_password_regex,
+    "regex, fused (method 2)": check_password_regex,
+    "lookup table (method 3)": classify_password
+}
+
+
+def benchmark_passwords(length):
+    """(case name, password) pairs of the given length"""
+    typical = ("Tr0ub4dor&3x" * (length // 12 + 1))[:length]
+    worst = "a" * length
+    return [("typical", typical), ("worst case", worst)]
+
+
+def time_call(check, password):
+    """Best time of one check(password) call, in microseconds"""
+    timer = timeit.Timer(lambda: check(password))
+    number, _ = timer.autorange()                        # Enough calls for ~0.2s
+    best = min(timer.repeat(repeat=5, number=number)) / number
+    return round(best * 1e6, 3)
+
+
+def run_benchmarks(lengths=BENCHMARK_LENGTHS, json_file=None):
+    """Time every check method on every input; print a table, optionally save JSON"""
+    results = []
+    for length in lengths:
+        for case, password in benchmark_passwords(length):
+            for method, check in BENCHMARK_METHODS.items():
+                results.append({"length": length, "case": case, "method": method,
+                                "microseconds": time_call(check, password)})
+    for case, password in ENTROPY_BENCHMARK_PASSWORDS:
+        results.append({"length": len(password), "case": case, "method": "entropy scorer",
+                        "microseconds": time_call(calculate_entropy_strength, password)})
+    
+    print(f"{'Length':>9}  {'Case':<11} {'Method':<28} {'µs per call':>12}")
+    print("-"*64)
+    for result in results:
+        print(f"{result['length']:>9,}  {result['case']:<11} {result['method']:<28} "
+              f"{result['microseconds']:>12,.3f}")
+    
+    if json_file:
+        with open(json_file, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+        print(f"\n✓ Results written to: {json_file}")
+    return results
+
+
 # ========== MAIN PROGRAM ==========
 def main():
     """Main program"""
@@ -188,6 +1028,61 @@ def main():
                 print(f"{status} {check}: {result}")
             print()
 
+# ========== COMMAND LINE ==========
+def run_command_line(args):
+    """Run headless commands, e.g. `python PasswordStrengthChecker.py audit leaked.txt`"""
+    parser = argparse.ArgumentParser(description="Password Strength Checker (headless mode)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    audit = commands.add_parser("audit", help="score every password in a file (one per line)")
+    audit.add_argument("passwords", help="password file, or - for standard input")
+    audit.add_argument("--output", help="write one CSV row of results per password to this file")
+    audit.add_argument("--include-passwords", action="store_true",
+                       help="also write each password to the output (off by default)")
+    audit.add_argument("--workers", type=int, default=1,
+                       help="number of worker processes (default: 1, no pool)")
+    audit.add_argument("--block-size", type=int, default=AUDIT_BLOCK_BYTES,
+                       help=f"bytes of the file scored at a time (default: {AUDIT_BLOCK_BYTES})")
+    audit.add_argument("--summary", metavar="FILE", help="also save the totals to a JSON file")
+    audit.add_argument("--scorer", choices=SCORERS, default="classes",
+                       help="classes: character-class checks (default); "
+                            "entropy: pattern-aware entropy estimate")
+    
+    build = commands.add_parser("build-blocklist",
+                                help="compile a leaked/common password list for fast lookups")
+    build.add_argument("source", help="text file with one password per line")
+    build.add_argument("--output", default=BLOCKLIST_FILE,
+                       help=f"blocklist file to write (default: {BLOCKLIST_FILE})")
+    
+    bench = commands.add_parser("bench", help="time the character checks and the entropy scorer")
+    bench.add_argument("--lengths", type=int, nargs="+", default=list(BENCHMARK_LENGTHS),
+                       help="password lengths to time (default: 12 1000 1000000)")
+    bench.add_argument("--json", help="also save the results to this JSON file")
+    
+    options = parser.parse_args(args)
+    
+    if options.command == "audit":
+        summary = audit_passwords(options.passwords, options.output, options.workers,
+                                  options.block_size, options.include_passwords, options.scorer)
+        display_audit_summary(summary)
+        if options.output:
+            print(f"\n✓ Results written to: {options.output}")
+        if options.summary:
+            with open(options.summary, 'w', encoding='utf-8') as file:
+                json.dump(summary, file, indent=2, ensure_ascii=False)
+            print(f"✓ Summary written to: {options.summary}")
+    
+    elif options.command == "build-blocklist":
+        count = build_blocklist(options.source, options.output)
+        print(f"✓ Blocklist written to: {options.output} ({count:,} passwords)")
+    
+    elif options.command == "bench":
+        run_benchmarks(options.lengths, options.json)
+
+
 # Run the program
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        run_command_line(sys.argv[1:])
+    else:
+        main()
\ No newline at end of file
@@ -65,42 +65,801 @@ RECIPE
 
 
 
+import argparse
+import bisect
+import csv
+import io
+import itertools
+import json
+import math
+import mmap
 import os  # For file operations to check if files exist on the computer
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+
+try:
+    import fcntl         # File locking on Linux/macOS
+except ImportError:
+    fcntl = None
+    import msvcrt        # File locking on Windows
+
+try:
+    import resource      # For the "peak MB" column of `bench` (not on Windows)
+except ImportError:
+    resource = None
+
+# Where tasks are stored: "text" (TASKS_FILE, the default) or "sqlite" (DATABASE_FILE).
+# Can also be chosen with the TODO_STORAGE environment variable.
+STORAGE_BACKEND = os.environ.get("TODO_STORAGE", "text")
+DATABASE_FILE = "tasks.db"
 
 # File to store tasks
 # TASKS_FILE is a constant variable (UPPERCASE by convention) where we will save tasks.
 TASKS_FILE = "tasks.txt"
 
+# Journal mode: each change is appended to JOURNAL_FILE as one small line instead
+# of rewriting TASKS_FILE. Every COMPACT_EVERY changes the journal is folded back
+# into TASKS_FILE (the "snapshot") by a background thread.
+USE_JOURNAL = True
+JOURNAL_FILE = "tasks.journal"
+COMPACT_EVERY = 1000
+
+# On-disk format. The first line of TASKS_FILE names the format version, the
+# last journal entry already included and the id the next new task gets, e.g.
+# "#todo-format 3 seq=120 next=58" (version 2 files have no "next="); each
+# other line is one task record (see format_record). Older files are plain
+# text, one task per line, and are migrated automatically when loaded.
+FORMAT_VERSION = 3
+FORMAT_HEADER = re.compile(r'^#todo-format (\d+) seq=(\d+)(?: next=(\d+))?$')
+LEGACY_HEADER = re.compile(r'^#journal-seq (\d+)$')
+
+
+# ========== TASK RECORDS ==========
+class Task:
+    """One to-do item"""
+    # __slots__ stores the fields without a per-task dict, keeping tasks small
+    __slots__ = ("id", "text", "done", "priority", "created", "completed")
+    
+    def __init__(self, id, text, done=False, priority=0, created=0, completed=0):
+        self.id = id                 # Stable number, never reused
+        self.text = text
+        self.done = done
+        self.priority = priority     # 0 = normal, higher = more important
+        self.created = created       # Unix timestamps (0 = unknown)
+        self.completed = completed
+    
+    def __str__(self):
+        return ("✓ " if self.done else "") + self.text
+
+
+_next_id = 1     # Id for the next new task
+_load_error = None      # Why TASKS_FILE could not be read; saving is refused until it can
+
+
+def new_task(text, priority=0):
+    """Create a task (change_tasks gives it its id when it is added)"""
+    return Task(0, text, priority=priority, created=int(time.time()))
+
+
+def escape_text(text):
+    """Make task text safe for a tab-separated line"""
+    return (text.replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def unescape_text(text):
+    """Undo escape_text"""
+    if '\\' not in text:
+        return text             # Nothing escaped (the usual case)
+    escapes = {'t': '\t', 'n': '\n', 'r': '\r'}
+    return re.sub(r'\\(.)', lambda m: escapes.get(m.group(1), m.group(1)), text)
+
+
+def format_record(task):
+    """One task as "id, done, priority, created, completed, text" (tab-separated)"""
+    return (f"{task.id}\t{int(task.done)}\t{task.priority}\t"
+            f"{task.created}\t{task.completed}\t{escape_text(task.text)}")
+
+
+def parse_record(record):
+    """Turn a format_record line back into a Task"""
+    id, done, priority, created, completed, text = record.split('\t', 5)
+    return Task(int(id), unescape_text(text), done == "1", int(priority),
+                int(created), int(completed))
+
+
+def parse_legacy_task(line, id):
+    """Turn a plain-text task (old format, "✓ " prefix = done) into a Task"""
+    if line.startswith("✓ "):
+        return Task(id, line[2:], done=True)
+    return Task(id, line)
+
+
+class TaskTable(MutableMapping):
+    """{id: Task} kept as columns (arrays) instead of one object per task
+    
+    A task costs its UTF-8 text plus about 30 bytes, about half the memory
+    of a plain string per task. Ids are not stored: the row of a task is its
+    id - first_id, so lookups, adds and removals stay O(1). A removed task
+    leaves an empty row behind until the list is next loaded. Texts share
+    one buffer, which is compacted once it is mostly removed text.
+    Tasks are handed out as new Task objects, so a changed task must be
+    stored back with tasks[task.id] = task.
+    """
+    PRESENT = 1              # Flag bits of a row
+    DONE = 2
+    MIN_COMPACT_BYTES = 1024 * 1024      # Removed text worth compacting the buffer for
+    
+    def __init__(self, tasks=()):
+        self.clear()
+        self.update(tasks)
+    
+    def clear(self):
+        self.first_id = 0                # Id of row 0 (the first task added)
+        self.flags = bytearray()         # PRESENT | DONE, 0 for an empty row
+        self.priorities = array('i')
+        self.created = array('q')        # Unix timestamps
+        self.completed = array('q')
+        self.text_starts = array('Q')    # Where each row's text is in text_buffer
+        self.text_lengths = array('I')
+        self.text_buffer = bytearray()   # Every text, UTF-8 encoded, one after another
+        self.removed_bytes = 0           # Bytes of text_buffer no row uses any more
+        self.count = 0                   # Tasks stored
+        self.done_count = 0              # ... of which completed
+    
+    def take_over(self, other):
+        """Switch to another TaskTable's tasks (used on reload)"""
+        self.__dict__.update(other.__dict__)
+        other.clear()
+    
+    def _columns(self):
+        return (self.priorities, self.created, self.completed, self.text_starts, self.text_lengths)
+    
+    def _row(self, task_id):
+        """The row of a stored task, or -1"""
+        row = task_id - self.first_id
+        if 0 <= row < len(self.flags) and self.flags[row]:
+            return row
+        return -1
+    
+    def _make_row(self, task_id):
+        """The row for task_id, adding empty rows to reach it if needed"""
+        if not self.flags:
+            self.first_id = task_id
+        elif task_id < self.first_id:
+            # Rare (ids normally only grow): make room at the front
+            gap = self.first_id - task_id
+            self.flags[0:0] = bytes(gap)
+            for column in self._columns():
+                column[0:0] = array(column.typecode, bytes(gap * column.itemsize))
+            self.first_id = task_id
+        
+        row = task_id - self.first_id
+        gap = row + 1 - len(self.flags)
+        if gap > 0:
+            self.flags.extend(bytes(gap))
+            for column in self._columns():
+                column.frombytes(bytes(gap * column.itemsize))
+        return row
+    
+    def _text(self, row):
+        start = self.text_starts[row]
+        return self.text_buffer[start:start + self.text_lengths[row]].decode('utf-8', 'surrogatepass')
+    
+    def _set_text(self, row, text):
+        encoded = text.encode('utf-8', 'surrogatepass')
+        start, length = self.text_starts[row], self.text_lengths[row]
+        if length == len(encoded) and self.text_buffer[start:start + length] == encoded:
+            return                       # Unchanged (e.g. the task was only completed)
+        self.removed_bytes += length
+        self.text_starts[row] = len(self.text_buffer)
+        self.text_lengths[row] = len(encoded)
+        self.text_buffer += encoded
+    
+    def _drop_text(self, row):
+        self.removed_bytes += self.text_lengths[row]
+        self.text_starts[row] = self.text_lengths[row] = 0
+        if (self.removed_bytes >= self.MIN_COMPACT_BYTES
+                and self.removed_bytes * 2 >= len(self.text_buffer)):
+            self._compact_texts()
+    
+    def _compact_texts(self):
+        """Copy the texts still in use to a new buffer (one pass)"""
+        buffer = bytearray()
+        starts, lengths, old_buffer = self.text_starts, self.text_lengths, self.text_buffer
+        for row, flags in enumerate(self.flags):
+            if flags:
+                start = starts[row]
+                starts[row] = len(buffer)
+                buffer += old_buffer[start:start + lengths[row]]
+        self.text_buffer = buffer
+        self.removed_bytes = 0
+    
+    def _task(self, row):
+        return Task(self.first_id + row, self._text(row), bool(self.flags[row] & self.DONE),
+                    self.priorities[row], self.created[row], self.completed[row])
+    
+    def last_id(self):
+        """Highest task id (0 if there are none)"""
+        for row in range(len(self.flags) - 1, -1, -1):
+            if self.flags[row]:
+                return self.first_id + row
+        return 0
+    
+    def count_completed(self):
+        return self.done_count
+    
+    def __contains__(self, task_id):
+        return isinstance(task_id, int) and self._row(task_id) >= 0
+    
+    def __getitem__(self, task_id):
+        row = self._row(task_id) if isinstance(task_id, int) else -1
+        if row < 0:
+            raise KeyError(task_id)
+        return self._task(row)
+    
+    def _append(self, task_id, task):
+        """Store a task in a new last row (the usual case, as ids only grow)"""
+        if not self.flags:
+            self.first_id = task_id
+        encoded = task.text.encode('utf-8', 'surrogatepass')
+        self.flags.append(self.PRESENT | (self.DONE if task.done else 0))
+        self.priorities.append(task.priority)
+        self.created.append(task.created)
+        self.completed.append(task.completed)
+        self.text_starts.append(len(self.text_buffer))
+        self.text_lengths.append(len(encoded))
+        self.text_buffer += encoded
+        self.count += 1
+        self.done_count += bool(task.done)
+    
+    def __setitem__(self, task_id, task):
+        if task_id - self.first_id == len(self.flags) or not self.flags:
+            self._append(task_id, task)
+            return
+        row = self._make_row(task_id)
+        old_flags = self.flags[row]
+        flags = self.PRESENT | (self.DONE if task.done else 0)
+        self.count += not old_flags
+        self.done_count += bool(flags & self.DONE) - bool(old_flags & self.DONE)
+        self.flags[row] = flags
+        self._set_text(row, task.text)
+        self.priorities[row] = task.priority
+        self.created[row] = task.created
+        self.completed[row] = task.completed
+    
+    def __delitem__(self, task_id):
+        row = self._row(task_id) if isinstance(task_id, int) else -1
+        if row < 0:
+            raise KeyError(task_id)
+        self.count -= 1
+        self.done_count -= bool(self.flags[row] & self.DONE)
+        self.flags[row] = 0
+        self._drop_text(row)
+    
+    def __iter__(self):
+        first_id = self.first_id
+        for row, flags in enumerate(self.flags):
+            if flags:
+                yield first_id + row
+    
+    def __len__(self):
+        return self.count
+    
+    def values(self):
+        """Every task in id order (made as they are reached, not kept)"""
+        buffer, done = self.text_buffer, self.DONE
+        rows = zip(itertools.count(self.first_id), self.flags, self.text_starts,
+                   self.text_lengths, self.priorities, self.created, self.completed)
+        for task_id, flags, start, length, priority, created, completed in rows:
+            if flags:
+                yield Task(task_id, buffer[start:start + length].decode('utf-8', 'surrogatepass'),
+                           bool(flags & done), priority, created, completed)
+    
+    def items(self):
+        return ((task.id, task) for task in self.values())
+
+
+def count_completed(tasks):
+    """Number of completed tasks (reads a flag, no text scanning)"""
+    if isinstance(tasks, (MappedTasks, TaskTable)):
+        return tasks.count_completed()
+    return sum(1 for task in tasks.values() if task.done)
+
+
 # ========== FILE HANDLING FUNCTIONS ==========
-def load_tasks():               # Reading from File
-    """Load tasks from file into a list"""
-    tasks = []                  # Create an empty list to hold all our to do items.
+def load_tasks(quiet=False):    # Reading from storage
+    """Load tasks from storage into a list"""
+    global _search_index
+    _search_index = None        # Rebuilt on the first search
+    return get_storage().load(quiet)
+
+
+def save_tasks(tasks):           # Writing to storage
+    """Save tasks list to storage"""
+    try:
+        get_storage().save(tasks)
+        print("✓ Tasks saved successfully!")
+        return True
+    except Exception as e:
+        print(f"❌ Error saving tasks: {e}")
+        return False
+
+
+def load_text_tasks(quiet=False, lazy=None):
+    """Load tasks from TASKS_FILE (and the journal) into a dict keyed by task id
     
-    # Check if file exists
-    if os.path.exists(TASKS_FILE):       # asks: "Does tasks.txt exist?"
-        try:
-            with open(TASKS_FILE, 'r') as file:     # Open and read the file
-                # Read each line and add to tasks list
-                for line in file:
-                    task = line.strip()          # Remove whitespace/newlines
-                    if task:                     # Ignore empty lines
-                        tasks.append(task)       # Add the cleaned task to the list
-            print(f"✓ Loaded {len(tasks)} task(s) from file.")
-        except Exception as e:
-            print(f"❌ Error loading tasks: {e}")
-    else:
-        print("📝 No existing tasks file found. Starting fresh!")
+    lazy=True maps the file instead of reading it (see MappedTasks); the
+    default does so for files of LAZY_LOAD_BYTES or more.
+    """
+    global _next_id, _load_error
+    tasks = TaskTable()         # Create an empty table to hold all our to do items.
+    snapshot_seq = 0
+    legacy = False              # True for files written before format version 2
+    _next_id = 1
+    _load_error = None
+    
+    # Hold the lock so no other program rewrites the files while we read them
+    with tasks_file_lock():
+        if lazy is None:
+            lazy = file_size(TASKS_FILE) >= LAZY_LOAD_BYTES
+        
+        # Check if file exists
+        if os.path.exists(TASKS_FILE):       # asks: "Does tasks.txt exist?"
+            try:
+                # newline='\n': only \n ends a record, as in the journal and MappedTasks
+                with open(TASKS_FILE, 'r', encoding='utf-8', newline='\n') as file:
+                    first_line = file.readline().rstrip('\r\n')
+                    header = FORMAT_HEADER.match(first_line)
+                    
+                    if header:
+                        if int(header.group(1)) > FORMAT_VERSION:
+                            raise ValueError(f"{TASKS_FILE} was written by a newer version")
+                        snapshot_seq = int(header.group(2))
+                        # Ids of removed tasks are never handed out again
+                        _next_id = int(header.group(3) or 1)
+                        if lazy:
+                            tasks = MappedTasks(TASKS_FILE)
+                        else:
+                            # Read each record and add to tasks list
+                            for line in file:
+                                if line.strip():
+                                    task = parse_record(line.rstrip('\r\n'))
+                                    tasks[task.id] = task
+                    else:
+                        legacy = True
+                        legacy_header = LEGACY_HEADER.match(first_line)
+                        if legacy_header:
+                            snapshot_seq = int(legacy_header.group(1))
+                            lines = file
+                        else:
+                            lines = [first_line] + list(file)
+                        for line in lines:
+                            task = line.strip()          # Remove whitespace/newlines
+                            if task:                     # Ignore empty lines
+                                task = parse_legacy_task(task, len(tasks) + 1)
+                                tasks[task.id] = task
+                
+                if isinstance(tasks, MappedTasks):
+                    _next_id = max(_next_id, tasks.last_id() + 1)
+                    if not quiet:
+                        print(f"✓ Opened {TASKS_FILE} ({file_size(TASKS_FILE) // 2**20} MB); "
+                              "tasks are read as they are needed.")
+                else:
+                    _next_id = max(_next_id, tasks.last_id() + 1)
+                    if not quiet:
+                        print(f"✓ Loaded {len(tasks)} task(s) from file.")
+            except Exception as e:
+                # Only part of the file was read: saving now would lose the rest
+                _load_error = f"{TASKS_FILE} could not be read ({e})"
+                print(f"❌ Error loading tasks: {e}")
+                print("⚠ Changes will not be saved until the file is fixed.")
+        elif not quiet:
+            print("📝 No existing tasks file found. Starting fresh!")
+        
+        if lazy and not isinstance(tasks, MappedTasks):
+            # No version-2 snapshot to map yet: keep tasks in memory until there is
+            mapped = MappedTasks()
+            mapped.added.update(tasks)
+            tasks = mapped
+        
+        # Replay changes made since the snapshot was written
+        _journal["seq"] = snapshot_seq
+        _journal["pending"] = 0
+        _journal["offset"] = 0
+        close_journal()
+        if USE_JOURNAL:
+            replayed = replay_journal(tasks, legacy)
+            if replayed and not quiet:
+                print(f"✓ Replayed {replayed} change(s) from the journal.")
+        
+        if legacy and tasks and not _load_error:
+            # Rewrite old files in the current format straight away
+            save_text_tasks(tasks)
+            print(f"✓ Upgraded {TASKS_FILE} to format version {FORMAT_VERSION}.")
+        
+        # Remember which version of the files this list matches
+        _journal["snapshot"] = file_version(TASKS_FILE)
+        _journal["offset"] = file_size(JOURNAL_FILE)
     
     return tasks
 
 
-def save_tasks(tasks):           # Writing to File
-    """Save tasks list to file"""
+def write_snapshot(records, seq=0, before_replace=None):
+    """Write task records (see format_record) to TASKS_FILE via a temporary file
+    
+    before_replace, if given, is called once the records are written and
+    just before the new file takes the old one's place.
+    """
+    # A crash part-way leaves only the temporary file behind, never a cut-off list
+    temp_file = f"{TASKS_FILE}.{os.getpid()}.tmp"
+    with open(temp_file, 'w', encoding='utf-8', newline='\n') as file:
+        # next= only ever grows, so it may run ahead of seq but never behind
+        file.write(f"#todo-format {FORMAT_VERSION} seq={seq} next={_next_id}\n")
+        # Write each task on a new line
+        for record in records:
+            file.write(record + '\n')
+        file.flush()
+        os.fsync(file.fileno())
+    if before_replace is not None:
+        before_replace()
+    os.replace(temp_file, TASKS_FILE)    # Swap in the complete file in one step
+
+
+def save_text_tasks(tasks):
+    """Write every task to TASKS_FILE"""
+    if USE_JOURNAL:
+        compact_journal(tasks, background=False)
+    else:
+        with tasks_file_lock():
+            snapshot_tasks(tasks)
+            _journal["snapshot"] = file_version(TASKS_FILE)
+
+
+# ========== LAZY LOADING (MEMORY-MAPPED TASKS) ==========
+# A TASKS_FILE of LAZY_LOAD_BYTES or more is not read into memory at start-up.
+# It is memory-mapped instead, and a task is only turned into a Task object
+# when it is viewed, searched or changed. Snapshots list tasks in id order
+# (ids only ever grow), so one task is found by binary search over the file.
+LAZY_LOAD_BYTES = 64 * 1024 * 1024
+MAP_BLOCK_BYTES = 4 * 1024 * 1024                         # Read at a time when scanning
+DONE_RECORD = re.compile(rb'^\d+\t1\t', re.MULTILINE)    # A completed task's line
+
+
+class MappedTasks(MutableMapping):
+    """{id: Task} read on demand from a memory-mapped TASKS_FILE snapshot"""
+    
+    def __init__(self, filename=None):
+        self.map = None
+        self.open(filename)
+    
+    def open(self, filename=None):
+        """Map a snapshot file (None = start empty) and forget earlier changes"""
+        self.close()
+        self.start = self.end = 0
+        if filename is not None and os.path.getsize(filename):
+            with open(filename, 'rb') as file:
+                self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.start = self.map.find(b"\n") + 1       # Skip the format header
+            self.end = len(self.map)
+        self.snapshot_last_id = self._last_snapshot_id()
+        self.changed = {}        # Snapshot tasks turned into Task objects (may be edited)
+        self.removed = set()     # Snapshot tasks removed since
+        self.added = {}          # Tasks added since, in order
+        self.counts = None       # (tasks, completed tasks) in the snapshot
+        self.changed_done = 0    # Tasks in changed/removed that were done in the snapshot
+    
+    def take_over(self, other):
+        """Switch to another MappedTasks' snapshot and changes (used on reload)"""
+        self.close()
+        self.__dict__.update(other.__dict__)
+        other.map = None
+    
+    def close(self):
+        """Unmap the snapshot (needed before the file can be replaced on Windows)"""
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+    
+    def _blocks(self):
+        """The snapshot's lines in blocks of about MAP_BLOCK_BYTES (never splitting a line)"""
+        position = self.start
+        while position < self.end:
+            block_end = self.map.find(b"\n", position + MAP_BLOCK_BYTES, self.end) + 1 or self.end
+            block = self.map[position:block_end]
+            if hasattr(mmap, "MADV_DONTNEED"):
+                # The block is a copy, so the OS may drop those pages: memory stays flat
+                page_start = position - position % mmap.PAGESIZE
+                self.map.madvise(mmap.MADV_DONTNEED, page_start, block_end - page_start)
+            yield block
+            position = block_end
+    
+    def _lines(self):
+        """(task id, line) for every snapshot line, in order"""
+        for block in self._blocks():
+            for line in block.split(b"\n"):
+                if line:
+                    yield int(line[:line.index(b"\t")]), line
+    
+    def _find(self, task_id):
+        """The snapshot line for a task id, or None (binary search)"""
+        low, high = self.start, self.end       # Both always at the start of a line
+        while low < high:
+            middle = (low + high) // 2
+            line_start = self.map.rfind(b"\n", low, middle) + 1 or low
+            line_end = self.map.find(b"\n", line_start, self.end)
+            if line_end < 0:
+                line_end = self.end
+            line = self.map[line_start:line_end]
+            line_id = int(line[:line.index(b"\t")]) if line else 0
+            if line_id == task_id:
+                return line
+            if line_id < task_id:
+                low = line_end + 1
+            else:
+                high = line_start
+        return None
+    
+    def _snapshot_counts(self):
+        """Count the snapshot's tasks and completed tasks (once, a block at a time)"""
+        if self.counts is None:
+            tasks = completed = 0
+            for block in self._blocks():
+                tasks += block.count(b"\n") + (not block.endswith(b"\n"))
+                completed += len(DONE_RECORD.findall(block))
+            self.counts = (tasks, completed)
+        return self.counts
+    
+    def _last_snapshot_id(self):
+        if self.map is not None and self.end > self.start:
+            line_start = self.map.rfind(b"\n", self.start, self.end - 1) + 1 or self.start
+            line = self.map[line_start:self.end].strip()
+            if line:
+                return int(line[:line.index(b"\t")])
+        return 0
+    
+    def last_id(self):
+        """Highest task id (0 if there are none)"""
+        if self.added:
+            return next(reversed(self.added))
+        return self.snapshot_last_id
+    
+    def count_completed(self):
+        completed = self._snapshot_counts()[1] - self.changed_done
+        return (completed + sum(1 for task in self.changed.values() if task.done)
+                + sum(1 for task in self.added.values() if task.done))
+    
+    def __getitem__(self, task_id):
+        if task_id in self.added:
+            return self.added[task_id]
+        if task_id in self.changed:
+            return self.changed[task_id]
+        if task_id in self.removed or self.map is None:
+            raise KeyError(task_id)
+        line = self._find(task_id)
+        if line is None:
+            raise KeyError(task_id)
+        # Kept, so changes made to the Task object are not lost
+        task = self.changed[task_id] = parse_record(line.decode('utf-8'))
+        self.changed_done += task.done
+        return task
+    
+    def __setitem__(self, task_id, task):
+        if task_id > self.snapshot_last_id or task_id in self.added or task_id not in self:
+            self.added[task_id] = task
+        else:
+            self.changed[task_id] = task      # Replaces a task from the snapshot
+    
+    def __delitem__(self, task_id):
+        if task_id in self.added:
+            del self.added[task_id]
+        else:
+            self[task_id]                # KeyError if there is no such task
+            del self.changed[task_id]
+            self.removed.add(task_id)
+    
+    def __iter__(self):
+        for task_id, line in self._lines():
+            if task_id not in self.removed:
+                yield task_id
+        yield from self.added
+    
+    def __len__(self):
+        return self._snapshot_counts()[0] - len(self.removed) + len(self.added)
+    
+    def values(self):
+        """Every task in order; unchanged ones are parsed as they are reached and not kept"""
+        for task_id, line in self._lines():
+            if task_id in self.changed:
+                yield self.changed[task_id]
+            elif task_id not in self.removed:
+                yield parse_record(line.decode('utf-8'))
+        yield from self.added.values()
+    
+    def items(self):
+        return ((task.id, task) for task in self.values())
+    
+    def clear(self):
+        self.open(None)
+
+
+def snapshot_tasks(tasks, seq=0):
+    """Write every task to TASKS_FILE (streaming straight from the map in lazy mode)"""
+    records = (format_record(task) for task in tasks.values())
+    if isinstance(tasks, MappedTasks):
+        write_snapshot(records, seq, before_replace=tasks.close)
+        tasks.open(TASKS_FILE)           # Everything is in the new snapshot now
+    else:
+        write_snapshot(records, seq)
+
+
+# ========== SHARING TASKS.TXT BETWEEN PROGRAMS ==========
+# Several copies of this program (or scripts) may use the same files. Every
+# read-modify-write happens while holding an exclusive lock on LOCK_FILE, and
+# before changing anything a program first catches up with what the others
+# wrote since it last looked (optimistic versioning: nothing is locked while a
+# user is typing; conflicts are found and merged at write time).
+LOCK_FILE = TASKS_FILE + ".lock"
+
+_lock = {"depth": 0, "file": None}
+_thread_lock = threading.RLock()     # Also keeps our compaction thread in line
+
+
+@contextmanager
+def tasks_file_lock():
+    """Hold the exclusive lock on the task files (re-entrant within a program)"""
+    with _thread_lock:
+        if _lock["depth"] == 0:
+            lock_file = open(LOCK_FILE, 'a+')
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            _lock["file"] = lock_file
+        _lock["depth"] += 1
+        try:
+            yield
+        finally:
+            _lock["depth"] -= 1
+            if _lock["depth"] == 0:
+                lock_file, _lock["file"] = _lock["file"], None
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+                lock_file.close()
+
+
+def file_version(filename):
+    """Identify one version of a file (changes whenever it is replaced)"""
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def file_size(filename):
+    """Size of a file in bytes (0 if it does not exist)"""
+    try:
+        return os.path.getsize(filename)
+    except FileNotFoundError:
+        return 0
+
+
+def catch_up(tasks):
+    """Bring tasks up to date with other programs' changes (hold the lock)"""
+    global _search_index
+    if file_version(TASKS_FILE) != _journal["snapshot"]:
+        # Someone rewrote the snapshot (e.g. compacted): start from it again
+        reloaded = load_text_tasks(quiet=True, lazy=isinstance(tasks, MappedTasks))
+        if isinstance(tasks, (MappedTasks, TaskTable)):
+            tasks.take_over(reloaded)
+        else:
+            tasks.clear()
+            tasks.update(reloaded)
+        _search_index = None
+        return True
+    if USE_JOURNAL and file_size(JOURNAL_FILE) != _journal["offset"]:
+        # Only new journal lines to apply
+        return replay_journal(tasks) > 0
+    return False
+
+
+# ========== JOURNAL (WRITE-AHEAD LOG) ==========
+# Journal lines look like "<seq>\t<change>\t<arguments>", for example:
+#   12  add     <task record, see format_record>
+#   13  done    7   1718000000      (task id, completion time)
+#   14  remove  7                   (task id)
+#   15  clear
+_journal = {
+    "seq": 0,             # Number of the last change applied to our list
+    "pending": 0,         # Changes in the journal since the last compaction
+    "offset": 0,          # Bytes of the journal already applied to our list
+    "snapshot": None,     # file_version() of the TASKS_FILE our list is based on
+    "file": None,         # Open append handle
+    "compactor": None     # Background compaction thread, if one is running
+}
+
+
+def apply_change(tasks, change, argument=""):
+    """Apply one change to the in-memory list (used live and on replay)"""
+    global _next_id
+    if change == "add":
+        task = parse_record(argument)
+        tasks[task.id] = task
+        _next_id = max(_next_id, task.id + 1)
+        index_add(task)
+    elif change == "remove":
+        index_remove(tasks.pop(int(argument)))      # KeyError if it is gone
+    elif change == "done":
+        # Completion does not change any words, so the search index is unaffected
+        task_id, completed = argument.split('\t')
+        task = tasks[int(task_id)]
+        task.done = True
+        task.completed = int(completed)
+        tasks[task.id] = task            # Stored back: tasks may hand out copies
+    elif change == "clear":
+        tasks.clear()
+        index_clear()
+    else:
+        raise ValueError(f"Unknown change '{change}'")
+
+
+def apply_legacy_change(tasks, change, argument=""):
+    """Replay a change from a pre-version-2 journal (list positions, plain text)"""
+    global _next_id
+    if change == "add":
+        tasks[_next_id] = parse_legacy_task(argument, _next_id)
+        _next_id += 1
+    elif change == "remove":
+        del tasks[list(tasks)[int(argument)]]
+    elif change == "done":
+        task = tasks[list(tasks)[int(argument)]]
+        task.done = True
+        tasks[task.id] = task
+    elif change == "clear":
+        tasks.clear()
+    else:
+        raise ValueError(f"Unknown change '{change}'")
+
+
+def change_still_applies(tasks, change, argument):
+    """False if another program already removed or completed the task"""
+    if change in ("remove", "done"):
+        task = tasks.get(int(str(argument).split('\t')[0]))
+        if task is None:
+            return False
+        return change == "remove" or not task.done
+    return True
+
+
+def change_tasks(tasks, change, argument=""):
+    """Apply a change and persist it through the storage backend"""
+    storage = get_storage()
     try:
-        with open(TASKS_FILE, 'w') as file:
-            # Write each task on a new line
-            for task in tasks:
-                file.write(task + '\n')
+        # Catch up with other programs first, then change the up-to-date list
+        with storage.writing(tasks):
+            if change == "add":
+                # Ids are handed out now, so they cannot clash with another program's
+                task = parse_record(argument)
+                task.id = storage.next_id()
+                argument = format_record(task)
+            elif not change_still_applies(tasks, change, argument):
+                print("⚠ That task was changed by someone else in the meantime.")
+                return False
+            
+            apply_change(tasks, change, argument)
+            storage.record(tasks, change, argument)
         print("✓ Tasks saved successfully!")
         return True
     except Exception as e:
@@ -108,35 +867,637 @@ def save_tasks(tasks):           # Writing to File
         return False
 
 
+def close_journal():
+    """Close our append handle (needed whenever the journal file is replaced)"""
+    if _journal["file"] is not None:
+        _journal["file"].close()
+        _journal["file"] = None
+
+
+def append_to_journal(tasks, changes):
+    """Persist (change, argument) pairs as journal lines (compacting now and then)"""
+    with tasks_file_lock():
+        if _journal["file"] is None:
+            _journal["file"] = open(JOURNAL_FILE, 'ab')
+            # A program that crashed mid-write may have left half a line: end it
+            if file_size(JOURNAL_FILE) and not journal_ends_with_newline():
+                _journal["file"].write(b"\n")
+        lines = []
+        for change, argument in changes:
+            _journal["seq"] += 1
+            lines.append(f"{_journal['seq']}\t{change}\t{argument}\n")
+        _journal["file"].write("".join(lines).encode('utf-8'))    # One write for all
+        _journal["file"].flush()
+        _journal["offset"] = _journal["file"].tell()
+        _journal["pending"] += len(lines)
+        
+        if _journal["pending"] >= COMPACT_EVERY:
+            compact_journal(tasks)
+
+
+def journal_ends_with_newline():
+    """True if the journal's last line is complete"""
+    with open(JOURNAL_FILE, 'rb') as file:
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) == b"\n"
+
+
+def replay_journal(tasks, legacy=False):
+    """Apply journal lines past our offset that are newer than our seq"""
+    replayed = 0
+    apply = apply_legacy_change if legacy else apply_change
+    
+    if not os.path.exists(JOURNAL_FILE):
+        return 0
+    
+    with open(JOURNAL_FILE, 'rb') as file:
+        file.seek(_journal["offset"])
+        for raw_line in file:
+            if not raw_line.endswith(b"\n"):
+                break                    # Line still being written (or torn): later
+            _journal["offset"] += len(raw_line)
+            parts = raw_line[:-1].decode('utf-8', 'replace').split('\t', 2)
+            if len(parts) < 2 or not parts[0].isdigit():
+                continue                 # Damaged line from a crash: ignore it
+            seq = int(parts[0])
+            if seq <= _journal["seq"]:
+                continue                 # Already part of our list
+            try:
+                apply(tasks, parts[1], parts[2] if len(parts) > 2 else "")
+            except (ValueError, KeyError, IndexError):
+                continue                 # Refers to a task that is already gone
+            _journal["seq"] = seq
+            replayed += 1
+    
+    _journal["pending"] += replayed
+    return replayed
+
+
+def compact_journal(tasks, background=True):
+    """Fold the journal into a fresh snapshot of TASKS_FILE"""
+    # Only one background compaction at a time. A synchronous one does not wait
+    # for it: our caller may hold the lock the thread needs, so joining would
+    # hang. The lock keeps the two writes apart, and the thread's older seq
+    # makes it give way to ours (see _write_compaction).
+    running = _journal["compactor"]
+    if background and running is not None and running.is_alive():
+        return
+
+    if isinstance(tasks, MappedTasks):
+        # Records are streamed from the map, so they are written right away
+        with tasks_file_lock():
+            _journal["pending"] = 0
+            _write_compaction((format_record(task) for task in tasks.values()),
+                              _journal["seq"], tasks)
+        return
+    
+    # Copy the list while no change can slip in, so copy and seq agree.
+    # Records are formatted now because Task objects may change afterwards.
+    with tasks_file_lock():
+        snapshot = [format_record(task) for task in tasks.values()]
+        seq = _journal["seq"]
+        _journal["pending"] = 0
+    
+    if background:
+        _journal["compactor"] = threading.Thread(
+            target=_write_compaction, args=(snapshot, seq), daemon=True)
+        _journal["compactor"].start()
+    else:
+        _write_compaction(snapshot, seq)
+
+
+def snapshot_seq_on_disk():
+    """The seq recorded in TASKS_FILE's header (0 if none)"""
+    try:
+        with open(TASKS_FILE, 'r', encoding='utf-8') as file:
+            header = FORMAT_HEADER.match(file.readline().rstrip('\n'))
+    except FileNotFoundError:
+        return 0
+    return int(header.group(2)) if header else 0
+
+
+def _write_compaction(snapshot, seq, mapped=None):
+    """Write the snapshot, then drop journal entries it already contains
+    
+    mapped is the MappedTasks the records come from, if any; it is switched
+    over to the new file.
+    """
+    with tasks_file_lock():
+        # Another program may have compacted further already: keep theirs
+        if snapshot_seq_on_disk() > seq:
+            return
+        
+        is_current = file_version(TASKS_FILE) == _journal["snapshot"]
+        if mapped is not None:
+            write_snapshot(snapshot, seq, before_replace=mapped.close)
+            mapped.open(TASKS_FILE)
+        else:
+            write_snapshot(snapshot, seq)
+        
+        # If we crash before this point, the snapshot's header tells load_tasks
+        # which journal entries to skip, so nothing is applied twice
+        close_journal()
+        newer = []
+        if os.path.exists(JOURNAL_FILE):
+            with open(JOURNAL_FILE, 'rb') as file:
+                for line in file:
+                    seq_text = line.split(b'\t', 1)[0]
+                    if seq_text.isdigit() and int(seq_text) > seq and line.endswith(b"\n"):
+                        newer.append(line)
+            with open(JOURNAL_FILE + ".tmp", 'wb') as file:
+                file.writelines(newer)
+            os.replace(JOURNAL_FILE + ".tmp", JOURNAL_FILE)
+        
+        # Our list already includes every remaining journal line if it was in
+        # step with the files before, so there is nothing to reload
+        if is_current and all(int(line.split(b'\t', 1)[0]) <= _journal["seq"] for line in newer):
+            _journal["snapshot"] = file_version(TASKS_FILE)
+            _journal["offset"] = file_size(JOURNAL_FILE)
+
+
+# ========== STORAGE BACKENDS ==========
+# Every backend offers the same methods, so the rest of the program does not
+# care where tasks live:
+#   load(quiet) -> {id: Task}        next_id() -> id for a new task
+#   reserve_ids(count) -> first of count consecutive new ids
+#   writing(tasks)                   context for a change: locks and catches up
+#   record(tasks, change, argument)  persist one change already applied in memory
+#   record_many(tasks, changes)      persist many (change, argument) pairs at once
+#   save(tasks)                      persist everything (used on exit)
+#   refresh(tasks) -> True if the list was updated with other programs' changes
+#   search(query) -> [(score, id)], or None to use the in-memory search index
+#   close()
+class TextFileStorage:
+    """Tasks in TASKS_FILE plus the journal (the original format)"""
+    
+    def load(self, quiet=False):
+        return load_text_tasks(quiet)
+    
+    def next_id(self):
+        return self.reserve_ids(1)
+    
+    def reserve_ids(self, count):
+        global _next_id
+        first = _next_id
+        _next_id += count
+        return first
+    
+    @contextmanager
+    def writing(self, tasks):
+        if _load_error:
+            raise ValueError(_load_error)
+        with tasks_file_lock():
+            catch_up(tasks)
+            yield
+    
+    def record(self, tasks, change, argument):
+        self.record_many(tasks, [(change, argument)])
+    
+    def record_many(self, tasks, changes):
+        if USE_JOURNAL and len(changes) < COMPACT_EVERY:
+            append_to_journal(tasks, changes)
+        else:
+            # Big batches: one fresh snapshot is cheaper than journaling each change.
+            # The seq moves on so no older pending compaction can overwrite it.
+            _journal["seq"] += 1
+            save_text_tasks(tasks)
+    
+    def save(self, tasks):
+        with self.writing(tasks):
+            save_text_tasks(tasks)
+    
+    def refresh(self, tasks):
+        with tasks_file_lock():
+            return catch_up(tasks)
+
+    
+    def search(self, query):
+        return None
+    
+    def close(self):
+        pass
+
+
+# Batches of at least this many new tasks fill SQLite's search index in bulk
+BULK_INDEX_MIN = 1000
+
+
+class SQLiteStorage:
+    """Tasks in an SQLite database that several programs can share safely"""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id        INTEGER PRIMARY KEY,
+            text      TEXT NOT NULL,
+            done      INTEGER NOT NULL DEFAULT 0,
+            priority  INTEGER NOT NULL DEFAULT 0,
+            created   INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks (done);
+        CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+    """
+    
+    # Full-text index kept in step with the tasks table by triggers
+    FTS_INSERT_TRIGGER = """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, text) VALUES (new.id, new.text);
+        END"""
+    FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts
+            USING fts5(text, content='tasks', content_rowid='id');
+        """ + FTS_INSERT_TRIGGER + """;
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF text ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            INSERT INTO tasks_fts (rowid, text) VALUES (new.id, new.text);
+        END;
+    """
+    
+    def __init__(self, filename=DATABASE_FILE):
+        self.is_new = not os.path.exists(filename)
+        # isolation_level=None: every statement commits on its own unless we BEGIN
+        self.connection = sqlite3.connect(filename, timeout=10, isolation_level=None)
+        # WAL lets readers and one writer work at the same time
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+        try:
+            self.connection.executescript(self.FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:      # SQLite built without FTS5
+            self.has_fts = False
+        self.data_version = self._data_version()
+    
+    def _data_version(self):
+        # Changes whenever another connection commits to the database
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+    
+    def load(self, quiet=False):
+        # Statements use ? parameters, so sqlite3 reuses their prepared form
+        rows = self.connection.execute(
+            "SELECT id, text, done, priority, created, completed FROM tasks ORDER BY id")
+        tasks = TaskTable((id, Task(id, text, bool(done), priority, created, completed))
+                          for id, text, done, priority, created, completed in rows)
+        
+        if self.is_new and os.path.exists(TASKS_FILE):
+            # First run on a new database: bring over the text file's tasks
+            tasks = load_text_tasks(quiet, lazy=False)
+            self.replace_all(tasks)
+            print(f"✓ Imported {len(tasks)} task(s) from {TASKS_FILE} into {DATABASE_FILE}.")
+        elif not quiet:
+            print(f"✓ Loaded {len(tasks)} task(s) from {DATABASE_FILE}.")
+        
+        self.is_new = False
+        self.data_version = self._data_version()
+        return tasks
+    
+    def next_id(self):
+        return self.reserve_ids(1)
+    
+    def reserve_ids(self, count):
+        # Ids are handed out from a counter row inside a write transaction,
+        # so two programs adding at the same time never get the same id
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR IGNORE INTO counters (name, value) "
+                "SELECT 'task_id', COALESCE(MAX(id), 0) FROM tasks")
+            connection.execute("UPDATE counters SET value = value + ? WHERE name = 'task_id'",
+                               (count,))
+            value = connection.execute(
+                "SELECT value FROM counters WHERE name = 'task_id'").fetchone()[0]
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return value - count + 1
+    
+    # Statement and parameters for each kind of change
+    STATEMENTS = {
+        "add": "INSERT INTO tasks (id, text, done, priority, created, completed) "
+               "VALUES (?, ?, ?, ?, ?, ?)",
+        "remove": "DELETE FROM tasks WHERE id = ?",
+        "done": "UPDATE tasks SET done = 1, completed = ? WHERE id = ?",
+        "clear": "DELETE FROM tasks"
+    }
+    
+    @staticmethod
+    def parameters(change, argument):
+        if change == "add":
+            task = parse_record(argument)
+            return (task.id, task.text, int(task.done), task.priority, task.created, task.completed)
+        if change == "remove":
+            return (int(argument),)
+        if change == "done":
+            task_id, completed = argument.split('\t')
+            return (int(completed), int(task_id))
+        return ()
+    
+    def record(self, tasks, change, argument):
+        # Each change is a single-row statement (clear is a single statement)
+        if change not in self.STATEMENTS:
+            raise ValueError(f"Unknown change '{change}'")
+        self.connection.execute(self.STATEMENTS[change], self.parameters(change, argument))
+    
+    def record_many(self, tasks, changes):
+        # One transaction; each run of the same kind of change is one executemany
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for change, group in itertools.groupby(changes, key=lambda pair: pair[0]):
+                if change not in self.STATEMENTS:
+                    raise ValueError(f"Unknown change '{change}'")
+                rows = [self.parameters(change, argument) for _, argument in group]
+                if change == "add" and self.has_fts and len(rows) >= BULK_INDEX_MIN:
+                    # Firing the index trigger once per row is several times slower
+                    # than filling the index in one statement (undone on ROLLBACK)
+                    connection.execute("DROP TRIGGER tasks_fts_insert")
+                    connection.executemany(self.STATEMENTS[change], rows)
+                    connection.executemany("INSERT INTO tasks_fts (rowid, text) VALUES (?, ?)",
+                                           (row[:2] for row in rows))
+                    connection.execute(self.FTS_INSERT_TRIGGER)
+                else:
+                    connection.executemany(self.STATEMENTS[change], rows)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+    
+    def save(self, tasks):
+        # Every change was already stored when it happened. Writing the whole
+        # list here would undo changes made by other programs in the meantime.
+        pass
+    
+    def replace_all(self, tasks):
+        """Replace every stored task in one transaction (used when importing)"""
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM tasks")
+            connection.executemany(
+                "INSERT INTO tasks (id, text, done, priority, created, completed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                ((task.id, task.text, int(task.done), task.priority, task.created, task.completed)
+                 for task in tasks.values()))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+    
+    def writing(self, tasks):
+        # SQLite does its own locking; every change is one statement
+        return nullcontext()
+    
+    def refresh(self, tasks):
+        global _search_index
+        if self._data_version() == self.data_version:
+            return False
+        reloaded = self.load(quiet=True)
+        if isinstance(tasks, TaskTable):
+            tasks.take_over(reloaded)
+        else:
+            tasks.clear()
+            tasks.update(reloaded)
+        _search_index = None
+        return True
+    
+    def search(self, query):
+        if not self.has_fts:
+            return None
+        # Every word must match; each also matches longer words it starts
+        match = " AND ".join(f'"{word}"*' for word in tokenize(query))
+        rows = self.connection.execute(
+            "SELECT rowid, bm25(tasks_fts) FROM tasks_fts WHERE tasks_fts MATCH ? "
+            "ORDER BY bm25(tasks_fts)", (match,))
+        # bm25 is lower for better matches; flip it so higher means better
+        return [(-score, task_id) for task_id, score in rows]
+    
+    def close(self):
+        self.connection.close()
+
+
+_storage = None
+
+
+def get_storage():
+    """The storage backend in use (opened on first use)"""
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND == "sqlite":
+            _storage = SQLiteStorage(DATABASE_FILE)
+        else:
+            _storage = TextFileStorage()
+    return _storage
+
+
+def refresh_tasks(tasks):
+    """Update tasks in place if another program changed them"""
+    return get_storage().refresh(tasks)
+
+
+# ========== SEARCH INDEX ==========
+# An inverted index: each word points at the tasks containing it, so a search
+# looks up a few words instead of scanning every task.
+# The index is built on the first search (so startup stays fast) and then kept
+# up to date by every change.
+MAX_RESULTS = 50
+_search_index = None
+
+
+def tokenize(text):
+    """Split text into lowercase words"""
+    return re.findall(r'\w+', text.lower())
+
+
+def build_search_index(tasks):
+    """Index every task from scratch"""
+    global _search_index
+    _search_index = {
+        "postings": {},      # word -> {task id: times the word appears}
+        "vocabulary": [],    # all words, sorted, for prefix lookups
+        "size": 0            # number of tasks indexed
+    }
+    for task in tasks.values():
+        post_task(task)
+    # Sorted once at the end: inserting word by word would be quadratic
+    _search_index["vocabulary"] = sorted(_search_index["postings"])
+    return _search_index
+
+
+def post_task(task):
+    """Add a task to the postings; return the words that are new to the index"""
+    key = task.id
+    _search_index["size"] += 1
+    
+    postings = _search_index["postings"]
+    new_words = []
+    for word in tokenize(task.text):
+        tasks_with_word = postings.get(word)
+        if tasks_with_word is None:
+            tasks_with_word = postings[word] = {}
+            new_words.append(word)
+        tasks_with_word[key] = tasks_with_word.get(key, 0) + 1      # Times the word appears
+    return new_words
+
+
+def index_add(task):
+    """Index a newly added task"""
+    if _search_index is None:
+        return
+    for word in post_task(task):
+        bisect.insort(_search_index["vocabulary"], word)
+
+
+def index_remove(task):
+    """Drop a removed task from the index"""
+    if _search_index is None:
+        return
+    key = task.id
+    _search_index["size"] -= 1
+    
+    postings = _search_index["postings"]
+    for word in set(tokenize(task.text)):
+        postings[word].pop(key, None)
+        if not postings[word]:          # Last task with this word
+            del postings[word]
+            vocabulary = _search_index["vocabulary"]
+            del vocabulary[bisect.bisect_left(vocabulary, word)]
+
+
+def index_clear():
+    """Empty the index"""
+    if _search_index is not None:
+        build_search_index({})
+
+
+def words_with_prefix(prefix):
+    """All indexed words starting with prefix (binary search, no scan)"""
+    vocabulary = _search_index["vocabulary"]
+    start = bisect.bisect_left(vocabulary, prefix)
+    end = bisect.bisect_left(vocabulary, prefix + "\U0010ffff")
+    return vocabulary[start:end]
+
+
+def query_index(query):
+    """Return [(score, task id)] for tasks matching every term, best first"""
+    postings = _search_index["postings"]
+    total = max(_search_index["size"], 1)
+    scores = None
+    
+    for term in tokenize(query):
+        # A term matches whole words, and words that start with it
+        term_scores = {}
+        for word in words_with_prefix(term):
+            # Rare words count for more; exact matches count double
+            weight = math.log(1 + total / len(postings[word])) * (2 if word == term else 1)
+            for key, count in postings[word].items():
+                term_scores[key] = term_scores.get(key, 0) + count * weight
+        
+        if scores is None:
+            scores = term_scores
+        else:
+            # AND: keep only tasks that matched every earlier term too
+            scores = {key: score + term_scores[key]
+                      for key, score in scores.items() if key in term_scores}
+        if not scores:
+            return []
+    
+    return sorted(((score, key) for key, score in (scores or {}).items()), reverse=True)
+
+
 # ========== TASK MANAGEMENT FUNCTIONS ==========
-def display_tasks(tasks):
-    """Display all tasks with numbers"""
-    print("\n" + "="*50)
-    print("           YOUR TO-DO LIST")
-    print("="*50)
+# Long lists are shown one page at a time. Only the tasks on the page are
+# formatted, and each page is written to the screen in one go.
+# Tasks are numbered by their id, so a task keeps its number when others are
+# removed, and between sessions.
+PAGE_SIZE = 20
+STATUS_NAMES = {"all": "", "open": "open ", "done": "completed "}
+
+
+def format_page(tasks, page=1, status="all", page_size=PAGE_SIZE):
+    """The text for one page of tasks, and the number of pages"""
+    completed = count_completed(tasks)
+    total = {"all": len(tasks), "open": len(tasks) - completed, "done": completed}[status]
+    pages = max(1, math.ceil(total / page_size))
+    page = min(max(page, 1), pages)
     
+    lines = ["", "="*50, "           YOUR TO-DO LIST", "="*50]
     if not tasks:  # If list is empty
-        print("\n  📭 No tasks yet! Your list is empty.")
-        print("     Add a task to get started!")
+        lines.append("\n  📭 No tasks yet! Your list is empty.")
+        lines.append("     Add a task to get started!")
     else:
-        print()
-        for index, task in enumerate(tasks, start=1):
-            # enumerate() gives us both index and value
-            # start=1 makes numbering begin at 1 instead of 0
-            print(f"  {index}. {task}")
-    
-    print("="*50)
+        lines.append(f"\n  {completed} of {len(tasks)} task(s) completed\n")
+        start = (page - 1) * page_size
+        # Only the tasks on this page are formatted
+        for task in itertools.islice(tasks_with_status(tasks, status), start, start + page_size):
+            lines.append(f"  {task.id}. {task}")
+        if not total:
+            lines.append(f"  No {STATUS_NAMES[status]}tasks.")
+        if pages > 1:
+            lines.append(f"\n  Page {page} of {pages} ({total} {STATUS_NAMES[status]}task(s))")
+    lines.append("="*50)
+    return "\n".join(lines) + "\n", pages
+
+
+def display_tasks(tasks, page=1, status="all", page_size=PAGE_SIZE):
+    """Display one page of tasks with numbers; returns the number of pages"""
+    text, pages = format_page(tasks, page, status, page_size)
+    sys.stdout.write(text)          # One write per page instead of a print per task
+    sys.stdout.flush()
+    return pages
+
+
+def browse_tasks(tasks):
+    """Page through the tasks, optionally showing only open or completed ones"""
+    page, status = 1, "all"
+    while True:
+        pages = display_tasks(tasks, page, status)
+        if pages == 1 and status == "all":
+            return
+        choice = input("\n[n]ext, [p]revious, page number, [o]pen, [d]one, [a]ll, "
+                       "or Enter to go back: ").strip().lower()
+        if choice == "":
+            return
+        elif choice == "n":
+            page = min(page + 1, pages)
+        elif choice == "p":
+            page = max(page - 1, 1)
+        elif choice.isdigit():
+            page = int(choice)
+        elif choice in ("o", "d", "a"):
+            page, status = 1, {"o": "open", "d": "done", "a": "all"}[choice]
+        else:
+            print("❌ Invalid choice!")
+
+
+def ask_task_number(tasks, prompt, status="all"):
+    """Show a page of tasks and ask for a task number (n/p switch pages)"""
+    page = 1
+    while True:
+        pages = display_tasks(tasks, page, status)
+        answer = input(prompt if pages == 1 else
+                       prompt.replace(": ", " (n/p for next/previous page): ")).strip().lower()
+        if answer == "n" and pages > 1:
+            page = min(page + 1, pages)
+        elif answer == "p" and pages > 1:
+            page = max(page - 1, 1)
+        else:
+            return int(answer)      # ValueError for anything else, as before
 
 
 def add_task(tasks):
     """Add a new task to the list"""
     print("\n--- Add New Task ---")
-    task = input("Enter task description: ").strip()
+    text = input("Enter task description: ").strip()
     
-    if task:  # Check if task is not empty
-        tasks.append(task)  # Add to the end of the list
-        print(f"✓ Added: '{task}'")
-        save_tasks(tasks)  # Save to file immediately
+    if text:  # Check if task is not empty
+        task = new_task(text)
+        if change_tasks(tasks, "add", format_record(task)):  # Add to the end of the list and save
+            print(f"✓ Added: '{text}'")
     else:
         print("❌ Task cannot be empty!")
 
@@ -147,22 +1508,18 @@ def remove_task(tasks):
         print("\n❌ No tasks to remove!")
         return
     
-    display_tasks(tasks)
-    
     print("\n--- Remove Task ---")
     try:
         # Get task number from user
-        task_num = int(input("Enter task number to remove: "))
+        task_num = ask_task_number(tasks, "Enter task number to remove: ")
         
-        # Check if number is valid (1 to length of list)
-        if 1 <= task_num <= len(tasks):
-            # Convert to list index (subtract 1)
-            index = task_num - 1
-            removed_task = tasks.pop(index)  # Remove and return the task
-            print(f"✓ Removed: '{removed_task}'")
-            save_tasks(tasks)
+        # Check if a task has this number (its id)
+        if task_num in tasks:
+            removed = str(tasks[task_num])
+            if change_tasks(tasks, "remove", task_num):  # Remove the task and save
+                print(f"✓ Removed: '{removed}'")
         else:
-            print(f"❌ Invalid number! Please choose 1-{len(tasks)}")
+            print(f"❌ Invalid number! There is no task {task_num}.")
     
     except ValueError:
         print("❌ Please enter a valid number!")
@@ -174,24 +1531,21 @@ def mark_complete(tasks):
         print("\n❌ No tasks to mark as complete!")
         return
     
-    display_tasks(tasks)
-    
     print("\n--- Mark Task as Complete ---")
     try:
-        task_num = int(input("Enter task number to mark complete: "))
+        task_num = ask_task_number(tasks, "Enter task number to mark complete: ", status="open")
         
-        if 1 <= task_num <= len(tasks):
-            index = task_num - 1
-            
+        if task_num in tasks:
             # Check if already marked
-            if "✓" not in tasks[index]:
-                tasks[index] = "✓ " + tasks[index]  # Add checkmark
-                print(f"✓ Marked complete: '{tasks[index]}'")
-                save_tasks(tasks)
+            if not tasks[task_num].done:
+                text = tasks[task_num].text
+                # Add checkmark and save
+                if change_tasks(tasks, "done", f"{task_num}\t{int(time.time())}"):
+                    print(f"✓ Marked complete: '✓ {text}'")
             else:
                 print("⚠ Task is already marked as complete!")
         else:
-            print(f"❌ Invalid number! Please choose 1-{len(tasks)}")
+            print(f"❌ Invalid number! There is no task {task_num}.")
     
     except ValueError:
         print("❌ Please enter a valid number!")
@@ -207,9 +1561,8 @@ def clear_all_tasks(tasks):
     confirm = input(f"Are you sure you want to delete all {len(tasks)} task(s)? (yes/no): ")
     
     if confirm.lower() in ['yes', 'y']:
-        tasks.clear()  # Remove all items from list
-        save_tasks(tasks)
-        print("✓ All tasks cleared!")
+        if change_tasks(tasks, "clear"):  # Remove all items from list and save
+            print("✓ All tasks cleared!")
     else:
         print("⚠ Clear cancelled.")
 
@@ -221,27 +1574,159 @@ def search_tasks(tasks):
         return
     
     print("\n--- Search Tasks ---")
-    keyword = input("Enter search keyword: ").strip().lower()
+    print("(All words must match; a word also matches longer words it starts)")
+    keyword = input("Enter search keyword(s): ").strip().lower()
     
-    if not keyword:
+    if not tokenize(keyword):
         print("❌ Please enter a keyword!")
         return
     
-    # Find matching tasks
-    matches = []
-    for index, task in enumerate(tasks, start=1):
-        if keyword in task.lower():  # Case-insensitive search
-            matches.append((index, task))
+    # Find matching tasks, most relevant first
+    matches = find_tasks(tasks, keyword)
     
     if matches:
         print(f"\n✓ Found {len(matches)} matching task(s):")
         print("-"*50)
-        for num, task in matches:
-            print(f"  {num}. {task}")
+        for score, task_id in matches[:MAX_RESULTS]:
+            if task_id in tasks:             # Skip tasks removed since the last refresh
+                print(f"  {task_id}. {tasks[task_id]}")
+        if len(matches) > MAX_RESULTS:
+            print(f"  ... and {len(matches) - MAX_RESULTS} more")
     else:
         print(f"\n❌ No tasks found containing '{keyword}'")
 
 
+# ========== BATCH OPERATIONS ==========
+# For scripts and the command line: many tasks are changed in memory first and
+# then stored with a single write (one journal append, one snapshot or one
+# transaction) instead of one save per task.
+BULK_FORMATS = ("text", "csv", "jsonl")
+EXPORT_FIELDS = ("id", "text", "done", "priority", "created", "completed")
+
+
+def add_many(tasks, new_tasks):
+    """Add tasks made with new_task, saving once; returns how many were added"""
+    new_tasks = list(new_tasks)
+    if not new_tasks:
+        return 0
+    storage = get_storage()
+    with storage.writing(tasks):
+        task_id = storage.reserve_ids(len(new_tasks))
+        for task in new_tasks:
+            task.id = task_id
+            task_id += 1
+            tasks[task.id] = task
+            index_add(task)
+        storage.record_many(tasks, [("add", format_record(task)) for task in new_tasks])
+    return len(new_tasks)
+
+
+def remove_many(tasks, task_ids):
+    """Remove tasks by id in one pass over the ids; returns how many were removed"""
+    storage = get_storage()
+    with storage.writing(tasks):
+        removed = []
+        for task_id in set(task_ids):
+            task = tasks.pop(task_id, None)     # O(1) whatever the list size
+            if task is not None:
+                index_remove(task)
+                removed.append(task_id)
+        if removed:
+            storage.record_many(tasks, [("remove", str(task_id)) for task_id in removed])
+    return len(removed)
+
+
+def complete_many(tasks, task_ids):
+    """Mark tasks complete by id, saving once; returns how many changed"""
+    wanted = set(task_ids)
+    completed = int(time.time())
+    storage = get_storage()
+    with storage.writing(tasks):
+        changes = []
+        for task in map(tasks.get, wanted):
+            if task is not None and not task.done:
+                task.done = True
+                task.completed = completed
+                tasks[task.id] = task
+                changes.append(("done", f"{task.id}\t{completed}"))
+        if changes:
+            storage.record_many(tasks, changes)
+    return len(changes)
+
+
+def bulk_format(filename, format=None):
+    """The format to use for a file: given, or guessed from its extension"""
+    if format:
+        return format
+    extension = os.path.splitext(filename)[1].lower()
+    return {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(extension, "text")
+
+
+def read_bulk_rows(filename, format=None, column="text"):
+    """Yield one dict per line of a text, CSV or JSONL file ("-" = standard input)"""
+    format = bulk_format(filename, format)
+    file = sys.stdin if filename == "-" else open(filename, 'r', encoding='utf-8', newline='')
+    try:
+        if format == "csv":
+            yield from csv.DictReader(file)
+        elif format == "jsonl":
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            # Plain text: each non-empty line is the value of one column
+            for line in file:
+                if line.strip():
+                    yield {column: line.strip()}
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+def tasks_from_rows(rows, priority=0):
+    """New tasks from rows with a "text" (and optionally "priority") column"""
+    for row in rows:
+        text = str(row.get("text") or "").strip()
+        if text:
+            yield new_task(text, int(row.get("priority") or priority))
+
+
+def ids_from_rows(rows):
+    """Task ids from rows with an "id" column"""
+    for row in rows:
+        yield int(row["id"])
+
+
+def tasks_with_status(tasks, status="all"):
+    """Tasks that are "open", "done", or "all" of them"""
+    if status == "open":
+        return (task for task in tasks.values() if not task.done)
+    if status == "done":
+        return (task for task in tasks.values() if task.done)
+    return iter(tasks.values())
+
+
+def export_tasks(tasks, output, format="text", status="all"):
+    """Write tasks to an open file one at a time; returns how many were written"""
+    count = 0
+    if format == "csv":
+        writer = csv.writer(output)
+        writer.writerow(EXPORT_FIELDS)
+        for task in tasks_with_status(tasks, status):
+            writer.writerow((task.id, task.text, int(task.done), task.priority,
+                             task.created, task.completed))
+            count += 1
+    elif format == "jsonl":
+        for task in tasks_with_status(tasks, status):
+            output.write(json.dumps({field: getattr(task, field) for field in EXPORT_FIELDS}) + "\n")
+            count += 1
+    else:
+        for task in tasks_with_status(tasks, status):
+            output.write(f"{task.id}\t{task}\n")
+            count += 1
+    return count
+
+
 # ========== MENU DISPLAY ==========
 def display_menu():
     """Display the main menu"""
@@ -269,11 +1754,13 @@ def main():
     tasks = load_tasks()
     
     while True:
+        # Pick up changes made by other programs sharing the same storage
+        refresh_tasks(tasks)
         display_menu()
         choice = input("\nEnter your choice (1-7): ").strip()
         
         if choice == '1':
-            display_tasks(tasks)
+            browse_tasks(tasks)
         
         elif choice == '2':
             add_task(tasks)
@@ -293,6 +1780,7 @@ def main():
         elif choice == '7':
             print("\n✓ Saving your tasks...")
             save_tasks(tasks)
+            get_storage().close()
             print("👋 Thank you for using To-Do List!")
             print("   Your tasks have been saved.\n")
             break
@@ -304,6 +1792,256 @@ def main():
         input("\nPress Enter to continue...")
 
 
+# ========== BENCHMARKS ==========
+# Drives the same functions the menu uses (without input()) on synthetic task
+# files, so storage backends and search strategies can be compared run over
+# run. Each case runs in a fresh process in a temporary folder.
+BENCHMARK_FORMAT = 1          # Bumped when the JSON layout changes
+BENCHMARK_BACKENDS = ("text", "lazy", "sqlite")
+BENCHMARK_WORDS = ("buy", "milk", "call", "mom", "write", "report", "fix", "bug", "plan",
+                   "trip", "email", "team", "book", "dentist", "clean", "garage", "pay",
+                   "bills", "review", "code", "water", "plants", "order", "parts")
+
+
+def write_synthetic_tasks(filename, num_tasks):
+    """Write a TASKS_FILE snapshot of num_tasks predictable tasks (every 10th done)"""
+    words = BENCHMARK_WORDS
+    with open(filename, 'w', encoding='utf-8') as file:
+        file.write(f"#todo-format {FORMAT_VERSION} seq=0 next={num_tasks + 1}\n")
+        for task_id in range(1, num_tasks + 1):
+            text = " ".join(words[(task_id * step) % len(words)] for step in (1, 7, 11))
+            file.write(f"{task_id}\t{int(task_id % 10 == 0)}\t{task_id % 3}\t0\t0\t"
+                       f"{text} {task_id}\n")
+
+
+def bytes_written():
+    """Bytes this process has written so far (None where the OS does not say)"""
+    try:
+        with open("/proc/self/io", 'r') as file:
+            for line in file:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def peak_memory_mb():
+    """Most memory this benchmark case has used, in MB (None without resource)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10    # Bytes on macOS, KB elsewhere
+
+
+def percentile(sorted_samples, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    rank = max(0, math.ceil(fraction * len(sorted_samples)) - 1)
+    return sorted_samples[rank]
+
+
+def measure(results, name, operation, arguments):
+    """Time operation(*argument) for every argument and add a summary to results"""
+    seconds = []
+    written_before = bytes_written()
+    for argument in arguments:
+        start = time.perf_counter()
+        operation(*argument)
+        seconds.append(time.perf_counter() - start)
+    written_after = bytes_written()
+    
+    seconds.sort()
+    total = sum(seconds)
+    results[name] = {
+        "samples": len(seconds),
+        "mean_ms": round(total / len(seconds) * 1000, 4),
+        "p50_ms": round(percentile(seconds, 0.50) * 1000, 4),
+        "p90_ms": round(percentile(seconds, 0.90) * 1000, 4),
+        "p99_ms": round(percentile(seconds, 0.99) * 1000, 4),
+        "max_ms": round(seconds[-1] * 1000, 4),
+        "ops_per_second": round(len(seconds) / total, 1) if total else None,
+        "bytes_written_per_op": (round((written_after - written_before) / len(seconds), 1)
+                                 if written_before is not None else None)
+    }
+
+
+def find_tasks(tasks, keyword):
+    """[(score, id)] for tasks matching every word of keyword, best first"""
+    matches = get_storage().search(keyword)
+    if matches is None:                      # Backend has no search of its own
+        if _search_index is None:
+            build_search_index(tasks)
+        matches = query_index(keyword)
+    return matches
+
+
+def _run_benchmark_case(num_tasks, backend, num_ops):
+    """Benchmark one task count and backend (runs in a fresh process)"""
+    global STORAGE_BACKEND, LAZY_LOAD_BYTES, _storage
+    STORAGE_BACKEND = "sqlite" if backend == "sqlite" else "text"
+    LAZY_LOAD_BYTES = 0 if backend == "lazy" else float("inf")
+    _storage = None
+    result = {"tasks": num_tasks, "backend": backend, "operations": {}}
+    operations = result["operations"]
+    ids = list(range(1, num_tasks + 1))
+    picks = [ids[(i * 7919) % len(ids)] for i in range(min(num_ops, num_tasks))]
+    # Two-word searches: a whole word and the start of another
+    words = BENCHMARK_WORDS
+    queries = [(f"{words[i % len(words)]} {words[i * 5 % len(words)][:3]}",) for i in range(num_ops)]
+    
+    saved_folder, saved_stdout = os.getcwd(), sys.stdout
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        sys.stdout = io.StringIO()       # Keep messages out of the timings
+        try:
+            write_synthetic_tasks(TASKS_FILE, num_tasks)
+            if backend == "sqlite":
+                load_tasks()             # Import tasks.txt once, outside the timings
+                get_storage().close()
+                _storage = None
+            
+            loaded = []
+            measure(operations, "load", lambda: loaded.append(load_tasks()), [()])
+            tasks = loaded[0]
+            measure(operations, "page", lambda page: format_page(tasks, page),
+                    [(1,), (num_tasks // PAGE_SIZE // 2 + 1,)])
+            measure(operations, "add", lambda text: change_tasks(
+                tasks, "add", format_record(new_task(text))),
+                [(f"benchmark task {i}",) for i in range(num_ops)])
+            measure(operations, "done", lambda task_id: change_tasks(
+                tasks, "done", f"{task_id}\t{int(time.time())}"), [(i,) for i in picks])
+            measure(operations, "remove", lambda task_id: change_tasks(
+                tasks, "remove", task_id), [(i,) for i in picks])
+            if backend != "sqlite":
+                measure(operations, "index_build", build_search_index, [(tasks,)])
+            measure(operations, "search", lambda keyword: find_tasks(tasks, keyword), queries)
+            measure(operations, "add_many", lambda count: add_many(
+                tasks, (new_task(f"bulk task {i}") for i in range(count))), [(num_ops * 10,)])
+            operations["add_many"]["tasks_per_second"] = round(
+                num_ops * 10 / (operations["add_many"]["mean_ms"] / 1000), 1)
+            measure(operations, "save", save_tasks, [(tasks,)])
+            
+            get_storage().close()
+            result["file_bytes"] = sum(file_size(name) for name in os.listdir("."))
+        finally:
+            sys.stdout = saved_stdout
+            os.chdir(saved_folder)
+    
+    result["peak_memory_mb"] = peak_memory_mb()
+    return result
+
+
+def run_benchmarks(task_counts=(10000, 100000, 1000000), backends=BENCHMARK_BACKENDS,
+                   num_ops=200, json_file=None):
+    """Benchmark every backend at every task count and print a table"""
+    columns = ("load", "add", "done", "remove", "search", "save")
+    results = []
+    print(f"\n{'tasks':>9} {'backend':>7} " + " ".join(f"{name + ' p50':>11}" for name in columns)
+          + f" {'add B/op':>9} {'peak MB':>8}")
+    print("-"*(36 + 12 * len(columns)))
+    
+    for num_tasks in task_counts:
+        for backend in backends:
+            # Its own process, so a big load in one case does not raise the
+            # peak reported for the next
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                result = pool.submit(_run_benchmark_case, num_tasks, backend, num_ops).result()
+            results.append(result)
+            
+            operations = result["operations"]
+            peak = result["peak_memory_mb"]
+            print(f"{num_tasks:>9} {backend:>7} "
+                  + " ".join(f"{operations[name]['p50_ms']:>9.3f}ms" for name in columns)
+                  + f" {operations['add']['bytes_written_per_op'] or 0:>9,.0f}"
+                  + f" {peak if peak is not None else float('nan'):>8.1f}")
+    
+    if json_file:
+        report = {"format": BENCHMARK_FORMAT, "created": int(time.time()),
+                  "python": sys.version.split()[0], "platform": sys.platform,
+                  "operations_per_case": num_ops, "results": results}
+        with open(json_file, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"\n✓ Results written to: {json_file}")
+    return results
+
+
+def run_command_line(args):
+    """Run headless commands, e.g. `python SimpleToDoList.py add "Buy milk"`"""
+    parser = argparse.ArgumentParser(description="Simple To-Do List (headless mode)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    add = commands.add_parser("add", help="add tasks from arguments or a file")
+    add.add_argument("texts", nargs="*", help="task descriptions")
+    add.add_argument("--file", help="text (one task per line), .csv or .jsonl file; - for stdin")
+    add.add_argument("--format", choices=BULK_FORMATS, help="file format (default: from extension)")
+    add.add_argument("--priority", type=int, default=0, help="priority for rows that have none")
+    
+    for name, help_text in (("remove", "remove tasks by id"), ("done", "mark tasks complete by id")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("ids", nargs="*", type=int, help="task ids")
+        command.add_argument("--file", help="text (one id per line), .csv or .jsonl file; - for stdin")
+        command.add_argument("--format", choices=BULK_FORMATS, help="file format (default: from extension)")
+    
+    show = commands.add_parser("list", help="show one page of tasks")
+    show.add_argument("--page", type=int, default=1, help="page to show (default: 1)")
+    show.add_argument("--page-size", type=int, default=PAGE_SIZE,
+                      help=f"tasks per page (default: {PAGE_SIZE})")
+    show.add_argument("--status", choices=["all", "open", "done"], default="all")
+    
+    export = commands.add_parser("export", help="write tasks to a file or stdout")
+    export.add_argument("--output", default="-", help="output file (default: - for stdout)")
+    export.add_argument("--format", choices=BULK_FORMATS, help="output format (default: from extension)")
+    export.add_argument("--status", choices=["all", "open", "done"], default="all")
+    
+    bench = commands.add_parser("bench", help="benchmark operations on synthetic task files")
+    bench.add_argument("--tasks", type=int, nargs="+", default=[10000, 100000, 1000000],
+                       help="task counts to try, e.g. 10000 10000000")
+    bench.add_argument("--backends", nargs="+", choices=BENCHMARK_BACKENDS,
+                       default=list(BENCHMARK_BACKENDS), help="storage to compare")
+    bench.add_argument("--ops", type=int, default=200, help="samples per operation (default: 200)")
+    bench.add_argument("--json", help="also save the results to this JSON file")
+    
+    options = parser.parse_args(args)
+    if options.command == "bench":
+        run_benchmarks(options.tasks, options.backends, options.ops, options.json)
+        return
+    tasks = load_tasks(quiet=True)
+    
+    try:
+        if options.command == "list":
+            display_tasks(tasks, options.page, options.status, options.page_size)
+        
+        elif options.command == "export":
+            format = bulk_format(options.output, options.format)
+            if options.output == "-":
+                export_tasks(tasks, sys.stdout, format, options.status)
+            else:
+                with open(options.output, 'w', encoding='utf-8', newline='') as output:
+                    count = export_tasks(tasks, output, format, options.status)
+                print(f"✓ Exported {count} task(s) to {options.output}.")
+        
+        elif options.command == "add":
+            rows = [{"text": text} for text in options.texts]
+            if options.file:
+                rows = itertools.chain(rows, read_bulk_rows(options.file, options.format))
+            count = add_many(tasks, tasks_from_rows(rows, options.priority))
+            print(f"✓ Added {count} task(s).")
+        
+        else:
+            ids = list(options.ids)
+            if options.file:
+                ids.extend(ids_from_rows(read_bulk_rows(options.file, options.format, column="id")))
+            if options.command == "remove":
+                print(f"✓ Removed {remove_many(tasks, ids)} task(s).")
+            else:
+                print(f"✓ Marked {complete_many(tasks, ids)} task(s) complete.")
+    finally:
+        get_storage().close()
+
+
 # Run the program
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        run_command_line(sys.argv[1:])
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""Tests for SimpleToDoList's text-file storage (run with `python -m pytest`)"""
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+import SimpleToDoList as todo
+
+
+class TextStorageTest(unittest.TestCase):
+    """Each test runs in an empty folder with a fresh text backend"""
+    
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.old_folder = os.getcwd()
+        os.chdir(self.folder.name)
+        self.old_settings = (todo.STORAGE_BACKEND, todo.COMPACT_EVERY)
+        todo.STORAGE_BACKEND = "text"
+        todo._storage = None
+        todo._journal.update(seq=0, pending=0, offset=0, snapshot=None, compactor=None)
+    
+    def tearDown(self):
+        running = todo._journal["compactor"]
+        if running is not None:
+            running.join(5)
+        todo.close_journal()
+        todo.STORAGE_BACKEND, todo.COMPACT_EVERY = self.old_settings
+        todo._storage = None
+        os.chdir(self.old_folder)
+        self.folder.cleanup()
+    
+    def quietly(self, function, *arguments):
+        with redirect_stdout(StringIO()):
+            return function(*arguments)
+    
+    def add(self, tasks, text):
+        self.quietly(todo.change_tasks, tasks, "add", todo.format_record(todo.new_task(text)))
+    
+    def test_save_after_background_compaction_does_not_hang(self):
+        todo.COMPACT_EVERY = 3
+        tasks = self.quietly(todo.load_tasks)
+        for text in ("one", "two", "three"):       # The third starts a compaction
+            self.add(tasks, text)
+        
+        # Saving (as the menu does on exit) must not wait on the compaction thread
+        saver = threading.Thread(target=self.quietly, args=(todo.save_tasks, tasks), daemon=True)
+        saver.start()
+        saver.join(10)
+        self.assertFalse(saver.is_alive(), "save_tasks hung behind the compaction thread")
+        todo._journal["compactor"].join(10)
+        
+        reloaded = self.quietly(todo.load_tasks)
+        self.assertEqual([task.text for task in reloaded.values()], ["one", "two", "three"])
+
+    def test_removed_ids_are_not_reused_after_compaction(self):
+        tasks = self.quietly(todo.load_tasks)
+        for text in ("one", "two", "three"):
+            self.add(tasks, text)
+        self.quietly(todo.change_tasks, tasks, "remove", 3)
+        self.quietly(todo.save_tasks, tasks)           # Snapshot without task 3
+
+        tasks = self.quietly(todo.load_tasks)
+        self.add(tasks, "five")
+        self.assertEqual(sorted(tasks), [1, 2, 4])
+
+    def test_carriage_return_in_text_survives_a_reload(self):
+        tasks = self.quietly(todo.load_tasks)
+        for text in ("one", "line\rbreak", "three"):
+            self.add(tasks, text)
+        self.quietly(todo.save_tasks, tasks)
+
+        reloaded = self.quietly(todo.load_tasks)
+        self.assertEqual([task.text for task in reloaded.values()], ["one", "line\rbreak", "three"])
+
+    def test_unreadable_file_is_not_saved_over(self):
+        with open(todo.TASKS_FILE, 'w', encoding='utf-8') as file:
+            file.write(f"#todo-format {todo.FORMAT_VERSION} seq=0 next=3\n"
+                       "1\t0\t0\t0\t0\tone\nnot a record\n2\t0\t0\t0\t0\ttwo\n")
+        with open(todo.TASKS_FILE, encoding='utf-8') as file:
+            before = file.read()
+
+        tasks = self.quietly(todo.load_tasks)
+        self.assertFalse(self.quietly(todo.save_tasks, tasks))
+        self.assertFalse(self.quietly(todo.change_tasks, tasks, "add",
+                                      todo.format_record(todo.new_task("new"))))
+        with open(todo.TASKS_FILE, encoding='utf-8') as file:
+            self.assertEqual(file.read(), before)
+
+
+class TaskTableTest(unittest.TestCase):
+    
+    def test_behaves_like_a_dict_of_tasks(self):
+        table = todo.TaskTable()
+        for task_id, text in ((1, "one"), (2, "twø"), (5, "five")):
+            table[task_id] = todo.Task(task_id, text, created=1700000000 + task_id)
+        task = table[2]
+        task.done, task.completed = True, 1700000100
+        table[2] = task
+        del table[1]
+        
+        self.assertEqual(list(table), [2, 5])
+        self.assertNotIn(1, table)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.count_completed(), 1)
+        self.assertEqual(table.last_id(), 5)
+        self.assertEqual([(t.id, t.text, t.done, t.created, t.completed) for t in table.values()],
+                         [(2, "twø", True, 1700000002, 1700000100), (5, "five", False, 1700000005, 0)])
+        with self.assertRaises(KeyError):
+            table[3]
+
+
+if __name__ == "__main__":
+    unittest.main()